@@ -0,0 +1,125 @@
+"""
+Behavior scoring overhead: per-message cost of BehaviorScorer.observe at a
+simulated high message rate, memory per tracked user, and the cost of a
+tier flush (one batched transaction on the DB thread) including the worst
+event-loop stall it causes.
+
+Run from the repo root:  python -m benchmarks.bench_behavior [--messages 200000 --users 20000 --rate 2000]
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.behavior import BehaviorScorer
+from src.cache import TTLCache
+from src.database import RespectRepository
+
+CHATTER = [
+    "lol", "gg", "thanks bob", "anyone up?", "that's wild", "ok", "did you see the game last night",
+    "ty for the help", "bruh moment", "respect", "what time is the raid tonight?", "honestly this patch is trash",
+]
+HOSTILE = ["bob you're useless", "SHUT UP BOB THIS IS DUMB", "stfu clown", "bob is trash lol"]
+
+class FakeUser:
+    __slots__ = ("id",)
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+class FakeMessage:
+    __slots__ = ("author", "content", "mentions")
+
+    def __init__(self, author, content):
+        self.author = author
+        self.content = content
+        self.mentions = []
+
+class SimClock:
+    """Advances by 1/rate per message, so decay and flood detection see a realistic timeline."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+async def measure_loop_stall(coro):
+    """Runs coro while a ticker measures the worst event-loop stall (ms)."""
+    worst = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst = max(worst, now - last - 0.001)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    result = await coro
+    running = False
+    await tick
+    return result, worst * 1000
+
+async def run(args):
+    rng = random.Random(args.seed)
+    users = [FakeUser(10_000 + u) for u in range(args.users)]
+    # A few trolls write most of the insults, so some users actually cross the demotion threshold
+    trolls = set(rng.sample(range(args.users), max(1, args.users // 50)))
+    messages = []
+    for _ in range(args.messages):
+        u = rng.randrange(args.users)
+        content = rng.choice(HOSTILE if rng.random() < (0.7 if u in trolls else 0.03) else CHATTER)
+        messages.append(FakeMessage(users[u], content))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = RespectRepository(Path(tmp) / "respect.db", cache=TTLCache())
+        await repo.open()
+        clock = SimClock()
+        scorer = BehaviorScorer(repo, clock=clock)
+        step = 1.0 / args.rate
+
+        start = time.perf_counter()
+        for message in messages:
+            clock.now += step
+            scorer.observe(message, 1)
+        elapsed = time.perf_counter() - start
+
+        # Memory is measured on a second pass; tracemalloc would distort the timing above
+        tracemalloc.start()
+        traced = BehaviorScorer(repo, clock=SimClock())
+        for message in messages:
+            traced.observe(message, 1)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{args.messages} messages from {args.users} users at a simulated {args.rate:.0f} msg/s")
+        print(f"observe        {elapsed / args.messages * 1e6:8.2f} us/msg   "
+              f"{args.messages / elapsed:10.0f} msg/s   "
+              f"{elapsed / args.messages * args.rate * 100:6.3f}% of one core at that rate")
+        print(f"memory         {current / 1e6:8.1f} MB for {len(traced._users)} users   "
+              f"({current / max(1, len(traced._users)):.0f} B/user)")
+
+        pending = scorer.stats()["pending"]
+        changed, stall = await measure_loop_stall(scorer.flush())
+        print(f"flush          {pending} queued -> {changed} tier changes in {scorer.last_flush_ms:.1f} ms   "
+              f"worst loop stall {stall:.1f} ms")
+        await repo.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--rate", type=float, default=2000.0, help="simulated msg/s (drives decay and flood detection)")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Respect-tier lookup microbenchmark: per-call sqlite3 connections vs. RespectRepository,
+with the tier cache disabled, then the cached repository path.
+
+Run from the repo root:  python -m benchmarks.bench_database
+"""
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src import database
+from src.cache import TTLCache
+from src.database import RespectRepository
+
+USERS = 2000
+LOOKUPS = 5000
+
+def report(label: str, ops: int, elapsed: float):
+    print(f"{label:<38} {ops / elapsed:>10.0f} ops/s  {elapsed / ops * 1e6:>8.1f} us/op")
+
+async def measure_loop_stall(coro):
+    """Runs coro while a ticker measures the worst event-loop stall (ms)."""
+    worst = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst = max(worst, now - last - 0.001)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    result = await coro
+    running = False
+    await tick
+    return result, worst * 1000
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = Path(tmp) / "bench_respect.db"
+        database.tier_cache = TTLCache(maxsize=0)  # Measure the storage paths themselves
+        database.init_db()
+
+        user_ids = [str(100000 + i) for i in range(USERS)]
+        tiers = {u: random.choice(database.VALID_TIERS) for u in user_ids}
+        sample = [random.choice(user_ids) for _ in range(LOOKUPS)]
+
+        # Legacy path: one connection per call, executed on the event loop thread
+        start = time.perf_counter()
+        for u, t in list(tiers.items())[:500]:
+            database.update_user_tier(u, t)
+        report("legacy update_user_tier (500)", 500, time.perf_counter() - start)
+
+        async def legacy_lookups():
+            for u in sample:
+                database.get_user_tier(u)
+                await asyncio.sleep(0)  # Yield like a reply would, so the ticker can observe the stall
+
+        start = time.perf_counter()
+        _, stall = await measure_loop_stall(legacy_lookups())
+        report("legacy get_user_tier", LOOKUPS, time.perf_counter() - start)
+        print(f"{'':<38} worst loop stall {stall:.1f} ms")
+
+        repo = RespectRepository(database.DB_PATH, cache=TTLCache(maxsize=0))
+        await repo.open()
+
+        start = time.perf_counter()
+        await repo.set_tiers(tiers)
+        report(f"repository set_tiers (bulk {USERS})", USERS, time.perf_counter() - start)
+
+        async def repo_lookups():
+            for u in sample:
+                await repo.get_tier(u)
+
+        start = time.perf_counter()
+        _, stall = await measure_loop_stall(repo_lookups())
+        report("repository get_tier", LOOKUPS, time.perf_counter() - start)
+        print(f"{'':<38} worst loop stall {stall:.1f} ms")
+
+        start = time.perf_counter()
+        for i in range(0, LOOKUPS, 50):
+            await repo.get_tiers(sample[i:i + 50])
+        report("repository get_tiers (batches of 50)", LOOKUPS, time.perf_counter() - start)
+
+        await repo.close()
+
+        cache = TTLCache()
+        repo = RespectRepository(database.DB_PATH, cache=cache)
+        start = time.perf_counter()
+        await repo_lookups()
+        report("cached repository get_tier", LOOKUPS, time.perf_counter() - start)
+        print(f"{'':<38} cache hit ratio {cache.stats()['hit_ratio']:.2%}")
+        await repo.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,252 @@
+"""
+Offline load test: drives BobBot.on_message with synthetic chat across N fake
+guilds/channels, with a mock provider behind the real ProviderRouter.
+
+Everything Discord-facing is stubbed (channels, history, send, typing), so
+the run needs no token and no network. Reports ingest throughput, reply
+latency (last message of a burst -> reply sent), event loop lag and memory.
+
+Run from the repo root:  python -m benchmarks.bench_load [--guilds 20 --channels 5 --rate 200 ...]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.bot import BobBot
+from src.database import RespectRepository
+from src.providers import LLMClient, ProviderError, ProviderRouter
+from src.relevance import RelevanceGate
+
+REPLIES = [
+    "Bruh. 😎", "Nah, that's cap. 🧢", "Say less. 🔥", "[SILENCE]",
+    "Look, I'm not doing your homework, but read the question twice before you panic. 👀",
+]
+CHATTER = [
+    "lol", "bob what do you think", "anyone up?", "that's wild", "hey bob", "gg",
+    "did you see the game last night", "bob you there?", "bruh moment", "ok", "<@1> settle this",
+]
+
+_ids = itertools.count(1_000_000)
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str, bot: bool = False):
+        self.id = user_id
+        self.name = self.display_name = name
+        self.bot = bot
+
+    def __str__(self):
+        return self.name
+
+class FakeMessage:
+    def __init__(self, channel, author, content):
+        self.id = next(_ids)
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.mentions = [channel.bot.user] if f"<@{channel.bot.user.id}>" in content else []
+        self.created_at = datetime.now(timezone.utc)
+
+    async def edit(self, content):
+        self.content = content
+        return self
+
+    async def delete(self):
+        pass
+
+    async def add_reaction(self, emoji):
+        pass
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeChannel:
+    def __init__(self, bot, channel_id: int, name: str, guild, position: int):
+        self.bot = bot
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.position = position
+        self.messages = []
+        self.last_user_at = None
+        self.reply_latencies = []
+        self.history_calls = 0
+
+    def typing(self):
+        return _Typing()
+
+    async def history(self, limit: int = 100):
+        self.history_calls += 1
+        for msg in reversed(self.messages[-limit:]):
+            yield msg
+
+    async def post(self, author, content):
+        """A user message arriving over the 'gateway'."""
+        msg = FakeMessage(self, author, content)
+        self.messages.append(msg)
+        self.last_user_at = time.perf_counter()
+        await self.bot.on_message(msg)
+
+    async def send(self, content):
+        if self.last_user_at is not None:
+            self.reply_latencies.append(time.perf_counter() - self.last_user_at)
+        msg = FakeMessage(self, self.bot.user, content)
+        self.messages.append(msg)
+        await self.bot.on_message(msg)  # The gateway echoes Bob's own messages back
+        return msg
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str):
+        self.id = guild_id
+        self.name = name
+        self.text_channels = []
+        self.voice_client = None
+
+class MockProvider(LLMClient):
+    """Local stand-in for a chat backend: log-normal latency around `latency`, failing at `error_rate`."""
+
+    name = "mock"
+
+    def __init__(self, latency: float, error_rate: float, rng: random.Random, prompts=None):
+        super().__init__(prompts=prompts)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = rng
+        self.calls = 0
+
+    async def _complete(self, messages: list) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.rng.lognormvariate(0, 0.5) * self.latency)
+        if self.rng.random() < self.error_rate:
+            raise ProviderError("mock failure")
+        return self.rng.choice(REPLIES)
+
+async def loop_lag_monitor(samples: list, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run(args):
+    rng = random.Random(args.seed)
+    tmp = tempfile.TemporaryDirectory()
+    bot = BobBot()
+    bot._connection.user = FakeUser(1, "Bob", bot=True)
+    bot.tiers = RespectRepository(db_path=Path(tmp.name) / "respect.db")
+    await bot.tiers.open()
+    if bot.behavior:
+        bot.behavior.repository = bot.tiers
+    provider = MockProvider(args.latency, args.error_rate, rng, prompts=bot.prompts)
+    bot.llm = ProviderRouter([provider], prompts=bot.prompts)
+    config = Path(tmp.name) / "relevance.json"
+    config.write_text(json.dumps({"default": {"mode": args.gate, "cooldown": args.cooldown}}))
+    bot.relevance = RelevanceGate(path=config, boss_id=bot.relevance.boss_id)
+
+    guilds, channels = [], []
+    for g in range(args.guilds):
+        guild = FakeGuild(10_000 + g, f"Guild {g}")
+        for c in range(args.channels):
+            channel = FakeChannel(bot, guild.id * 1000 + c, f"channel-{c}", guild, c)
+            guild.text_channels.append(channel)
+            channels.append(channel)
+        guilds.append(guild)
+    bot.names.rebuild(guilds)
+    users = [FakeUser(2_000 + u, f"user{u}") for u in range(args.users)]
+
+    lag = []
+    monitor = asyncio.create_task(loop_lag_monitor(lag))
+    tracemalloc.start()
+
+    # Bursty traffic: a channel gets a short burst, then the stream moves on
+    interval = 1.0 / args.rate if args.rate else 0.0
+    ingest_time = 0.0
+    start = time.perf_counter()
+    for i in range(args.messages):
+        channel = rng.choice(channels)
+        t0 = time.perf_counter()
+        await channel.post(rng.choice(users), rng.choice(CHATTER))
+        ingest_time += time.perf_counter() - t0
+        if interval:
+            await asyncio.sleep(max(0.0, start + (i + 1) * interval - time.perf_counter()))
+    sent_for = time.perf_counter() - start
+
+    # Drain: every pending burst fires and its reply (or silence), including follow-ups, completes
+    deadline = time.perf_counter() + args.drain_timeout
+    while time.perf_counter() < deadline:
+        pending = asyncio.all_tasks() - {asyncio.current_task(), monitor}
+        if not pending and not bot.debouncer.stats()["pending"]:
+            break
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    monitor.cancel()
+
+    latencies = [l for c in channels for l in c.reply_latencies]
+    stats = bot.stats()
+    print(f"{args.guilds} guilds x {args.channels} channels, {args.users} users, {args.messages} messages "
+          f"at {args.rate or 'max'} msg/s; mock provider {args.latency * 1000:.0f} ms, {args.error_rate:.0%} errors")
+    print(f"ingest       {args.messages / ingest_time:10.0f} msg/s in on_message   "
+          f"{args.messages / sent_for:8.0f} msg/s offered   run {elapsed:.1f}s")
+    print(f"replies      {len(latencies):6d}   provider calls {provider.calls}   "
+          f"history fetches {sum(c.history_calls for c in channels)}   unfinished {len(pending)}")
+    print(f"reply latency p50 {percentile(latencies, 0.5) * 1000:7.0f} ms   p95 {percentile(latencies, 0.95) * 1000:7.0f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.0f} ms   (includes the debounce wait)")
+    print(f"loop lag     p50 {percentile(lag, 0.5) * 1000:7.2f} ms   p99 {percentile(lag, 0.99) * 1000:7.2f} ms   "
+          f"max {max(lag, default=0) * 1000:7.2f} ms")
+    print(f"memory       current {current / 1e6:6.1f} MB   peak {peak / 1e6:6.1f} MB (tracemalloc)")
+    print(f"scheduler    merged {stats['scheduler']['merged']}   shed {stats['scheduler']['shed']}   "
+          f"wait p95 {stats['scheduler']['wait_p95_ms']:.0f} ms")
+    print(f"outbound     calls {stats['outbound']['calls']}   merged {stats['outbound']['merged']}   "
+          f"throttled {stats['outbound']['throttled_s']:.1f}s   rate limited {stats['outbound']['rate_limited']}")
+    gate = stats["relevance"]
+    print(f"relevance    mode {args.gate}   dropped {gate['dropped']} ({gate['drop_ratio']:.0%})   "
+          f"provider calls saved {gate['provider_calls_saved']}   {gate['reasons']}")
+    if args.verbose:
+        print(bot.metrics.render())
+
+    await bot.tiers.close()
+    await bot.llm.close()
+    tmp.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=5, help="text channels per guild")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200.0, help="offered msg/s; 0 sends as fast as possible")
+    parser.add_argument("--latency", type=float, default=0.8, help="mean mock provider latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--drain-timeout", type=float, default=60.0)
+    parser.add_argument("--gate", choices=("all", "relevant"), default="all", help="relevance gate mode")
+    parser.add_argument("--cooldown", type=float, default=0.0, help="relevance gate cooldown (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="also dump the Prometheus metrics")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("Providers").setLevel(logging.CRITICAL)  # Injected failures are expected
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
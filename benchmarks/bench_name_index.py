@@ -0,0 +1,101 @@
+"""
+[[TX]] target resolution at 1k guilds x 100 channels: the old linear scan
+(exact, lowercase loop, difflib over every name) vs. NameIndex.
+
+Run from the repo root:  python -m benchmarks.bench_name_index
+"""
+import difflib
+import random
+import string
+import time
+from types import SimpleNamespace
+
+from src.name_index import NameIndex
+
+GUILDS = 1000
+CHANNELS = 100
+QUERIES = 300
+
+WORDS = ["chill", "gaming", "crew", "den", "lounge", "hub", "squad", "zone", "club", "base",
+         "arcade", "memes", "street", "vibes", "corner", "garage", "study", "music", "art", "dev"]
+
+def make_name(rng, parts=2):
+    return "-".join(rng.choice(WORDS) for _ in range(parts)) + f"-{rng.randint(0, 9999)}"
+
+def make_guilds(rng):
+    guilds = []
+    for g in range(GUILDS):
+        guild = SimpleNamespace(id=g, name=make_name(rng, 3).replace("-", " ").title(), text_channels=[])
+        guild.text_channels = [
+            SimpleNamespace(id=g * 1000 + c, name=make_name(rng), position=c, guild=guild) for c in range(CHANNELS)
+        ]
+        guilds.append(guild)
+    return guilds
+
+def typo(rng, name):
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+def legacy_resolve(guilds, server_name, channel_name):
+    target_guild = next((g for g in guilds if g.name == server_name), None)
+    if not target_guild:
+        target_guild = next((g for g in guilds if g.name.lower() == server_name.lower()), None)
+    if not target_guild:
+        matches = difflib.get_close_matches(server_name, [g.name for g in guilds], n=1, cutoff=0.5)
+        target_guild = next((g for g in guilds if matches and g.name == matches[0]), None)
+    if not target_guild:
+        return None, None
+
+    channels = target_guild.text_channels
+    target_channel = next((c for c in channels if c.name == channel_name), None)
+    if not target_channel:
+        target_channel = next((c for c in channels if c.name.lower() == channel_name.lower()), None)
+    if not target_channel:
+        matches = difflib.get_close_matches(channel_name, [c.name for c in channels], n=1, cutoff=0.5)
+        target_channel = next((c for c in channels if matches and c.name == matches[0]), None)
+    return target_guild, target_channel
+
+def indexed_resolve(index, server_name, channel_name):
+    guild, _ = index.resolve_guild(server_name)
+    if not guild:
+        return None, None
+    channel, _ = index.resolve_channel(guild, channel_name)
+    return guild, channel
+
+def main():
+    rng = random.Random(7)
+    guilds = make_guilds(rng)
+
+    targets = [(g, rng.choice(g.text_channels)) for g in rng.sample(guilds, QUERIES)]
+    workloads = {
+        "exact": [(g.name, c.name) for g, c in targets],
+        "case-insensitive": [(g.name.upper(), c.name.upper()) for g, c in targets],
+        "fuzzy (1 typo)": [(typo(rng, g.name), typo(rng, c.name)) for g, c in targets],
+    }
+
+    start = time.perf_counter()
+    index = NameIndex()
+    index.rebuild(guilds)
+    print(f"{GUILDS} guilds x {CHANNELS} channels; guild index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Channel tables are built on a guild's first lookup; pay that up front so the loops measure steady state
+    start = time.perf_counter()
+    for guild, _ in targets:
+        index.resolve_channel(guild, guild.text_channels[0].name)
+    print(f"{QUERIES} channel tables built in {(time.perf_counter() - start) * 1000:.1f} ms (one-off, on first use)")
+
+    for label, queries in workloads.items():
+        start = time.perf_counter()
+        legacy = [legacy_resolve(guilds, s, c) for s, c in queries]
+        legacy_t = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = [indexed_resolve(index, s, c) for s, c in queries]
+        indexed_t = time.perf_counter() - start
+
+        agree = sum(a[0] is b[0] and a[1] is b[1] for a, b in zip(legacy, indexed))
+        print(f"{label:<17} legacy {legacy_t / QUERIES * 1e6:9.1f} us/call   "
+              f"index {indexed_t / QUERIES * 1e6:8.1f} us/call   same result {agree}/{QUERIES}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+System prompt assembly cost for a bot in hundreds of guilds with large channel lists:
+the old per-reply rebuild vs. PromptBuilder's cached persona and memoized environments.
+
+Run from the repo root:  python -m benchmarks.bench_prompt
+"""
+import random
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.prompt_builder import PromptBuilder, TIER_INSTRUCTIONS, DEFAULT_TIER_INSTRUCTION
+
+GUILDS = 500
+CHANNELS_PER_GUILD = 150
+REPLIES = 20000
+
+def make_guilds():
+    guilds = []
+    for g in range(GUILDS):
+        guild = SimpleNamespace(id=g, name=f"server-{g}", text_channels=[])
+        guild.text_channels = [
+            SimpleNamespace(id=g * 1000 + c, name=f"channel-{c}-{'x' * (c % 12)}", guild=guild)
+            for c in range(CHANNELS_PER_GUILD)
+        ]
+        guilds.append(guild)
+    return guilds
+
+def legacy_prompt(persona: str, guilds, channel, user_tier: int) -> str:
+    """What process_channel_response + generate_response did on every reply before PromptBuilder."""
+    context_info = {
+        "server_name": channel.guild.name,
+        "channel_name": channel.name,
+        "visible_channels": [c.name for c in channel.guild.text_channels],
+        "available_servers": [g.name for g in guilds],
+    }
+    env_block = (
+        "\n\n[ENVIRONMENT DATA]\n"
+        f"Current Server: {context_info.get('server_name', 'Unknown')}\n"
+        f"Current Channel: {context_info.get('channel_name', 'Unknown')}\n"
+        f"Channels: {', '.join(context_info.get('visible_channels', []))}\n"
+    )
+    tier_instruction = f"{env_block}\n[CURRENT INTERACTION CONTEXT]\nThe user you are replying to is Respect Tier {user_tier}."
+    tier_instruction += TIER_INSTRUCTIONS.get(user_tier, DEFAULT_TIER_INSTRUCTION)
+    return persona + tier_instruction
+
+def main():
+    persona_path = Path("docs/bob_system_prompt.md")
+    guilds = make_guilds()
+    # Replies cluster in a minority of active channels, like real traffic
+    active = [random.choice(random.choice(guilds).text_channels) for _ in range(300)]
+    workload = [(random.choice(active), random.choice((1, 2, 2, 2, 3))) for _ in range(REPLIES)]
+
+    # The legacy clients read the persona once at construction, so it is not charged per reply
+    persona = persona_path.read_text(encoding="utf-8")
+    start = time.perf_counter()
+    for channel, tier in workload:
+        legacy_prompt(persona, guilds, channel, tier)
+    legacy = time.perf_counter() - start
+
+    builder = PromptBuilder(persona_path)
+    start = time.perf_counter()
+    for channel, tier in workload:
+        builder.system_prompt(tier, builder.context_info(channel))
+    cached = time.perf_counter() - start
+
+    sample_channel, sample_tier = workload[0]
+    assert builder.system_prompt(sample_tier, builder.context_info(sample_channel)) == \
+        legacy_prompt(persona, guilds, sample_channel, sample_tier)
+
+    print(f"{GUILDS} guilds x {CHANNELS_PER_GUILD} channels, {REPLIES} replies")
+    print(f"legacy per-reply rebuild  {legacy / REPLIES * 1e6:8.1f} us/reply")
+    print(f"PromptBuilder             {cached / REPLIES * 1e6:8.1f} us/reply  ({legacy / cached:.1f}x)")
+    print(f"builder stats: {builder.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Warm-restart benchmark: how long a freshly started bot takes to have every
+active channel's context back in memory, cold (one channel.history() call
+per channel, at a simulated API latency) versus from a local snapshot.
+
+Also reports the snapshot's size, the time to save it and the worst
+event-loop stall while saving, and the startup cost of reading its index.
+
+Run from the repo root:  python -m benchmarks.bench_snapshot [--guilds 50 --channels 10 --history-latency 0.15]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_behavior import measure_loop_stall
+from benchmarks.bench_load import CHATTER, FakeChannel, FakeGuild, FakeMessage, FakeUser
+from src.bot import BobBot
+from src.snapshot import SnapshotStore
+
+class SlowChannel(FakeChannel):
+    """history() pays a simulated REST round-trip, like the real API on a cold channel."""
+
+    latency = 0.15
+
+    async def history(self, limit: int = 100):
+        self.history_calls += 1
+        await asyncio.sleep(self.latency)
+        for msg in reversed(self.messages[-limit:]):
+            yield msg
+
+def make_bot(snapshot_path):
+    bot = BobBot()
+    bot._connection.user = FakeUser(1, "Bob", bot=True)
+    bot.snapshots = SnapshotStore(path=snapshot_path) if snapshot_path else None
+    return bot
+
+def make_world(bot, args, rng):
+    users = [FakeUser(2_000 + u, f"user{u}") for u in range(args.users)]
+    channels = []
+    for g in range(args.guilds):
+        guild = FakeGuild(10_000 + g, f"Guild {g}")
+        for c in range(args.channels):
+            channel = SlowChannel(bot, guild.id * 1000 + c, f"channel-{c}", guild, c)
+            for _ in range(args.backlog):
+                channel.messages.append(FakeMessage(channel, rng.choice(users), rng.choice(CHATTER) + " " * rng.randrange(40)))
+            guild.text_channels.append(channel)
+            channels.append(channel)
+    return channels
+
+def rebind(channels, bot):
+    """The same channels as seen by a restarted bot (fresh fetch counters)."""
+    for channel in channels:
+        channel.bot = bot
+        channel.history_calls = 0
+
+async def time_to_warm(bot, channels, concurrency: int) -> float:
+    """Seconds until every channel's history is in memory, `concurrency` bursts at a time."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def warm(channel):
+        async with slots:
+            await bot._get_history(channel)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(warm(c) for c in channels))
+    return time.perf_counter() - start
+
+async def run(args):
+    SlowChannel.latency = args.history_latency
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "snapshot.bin"
+
+        # The bot that is about to be redeployed: warm caches and rolling summaries everywhere
+        old = make_bot(path)
+        channels = make_world(old, args, rng)
+        await time_to_warm(old, channels, args.concurrency)
+        for channel in channels:
+            history = await old._get_history(channel)
+            old.context_window.build(channel.id, history, args.budget)
+        _, stall = await measure_loop_stall(old.save_snapshot())
+        snap = old.snapshots.stats()
+        print(f"{len(channels)} channels x {args.backlog} messages, history API {args.history_latency * 1000:.0f} ms, "
+              f"{args.concurrency} concurrent bursts")
+        print(f"save         {snap['last_save_bytes'] / 1024:8.0f} KiB in {snap['last_save_ms']:6.1f} ms   "
+              f"worst loop stall {stall:.1f} ms")
+
+        # Restart without a snapshot
+        cold = make_bot(None)
+        rebind(channels, cold)
+        cold_s = await time_to_warm(cold, channels, args.concurrency)
+        cold_fetches = sum(c.history_calls for c in channels)
+
+        # Restart with the snapshot
+        warm = make_bot(path)
+        rebind(channels, warm)
+        start = time.perf_counter()
+        warm.snapshots.load()
+        load_ms = (time.perf_counter() - start) * 1000
+        warm_s = await time_to_warm(warm, channels, args.concurrency)
+        warm_fetches = sum(c.history_calls for c in channels)
+        restored = warm.snapshots.stats()
+
+        print(f"load index   {load_ms:8.2f} ms")
+        print(f"cold start   {cold_s * 1000:8.0f} ms to warm   history fetches {cold_fetches}")
+        print(f"snapshot     {warm_s * 1000:8.0f} ms to warm   history fetches {warm_fetches}   "
+              f"restored {restored['restored_channels']} channels / {restored['restored_messages']} messages "
+              f"in {restored['restore_ms']:.1f} ms   summaries {warm.context_window.stats()['channels']}")
+        print(f"speedup      {cold_s / warm_s if warm_s else float('inf'):8.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--channels", type=int, default=10, help="text channels per guild")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--backlog", type=int, default=60, help="messages already in each channel")
+    parser.add_argument("--history-latency", type=float, default=0.15, help="simulated channel.history() latency (s)")
+    parser.add_argument("--concurrency", type=int, default=10, help="channels warmed at once")
+    parser.add_argument("--budget", type=int, default=250, help="history token budget (small budgets fold more into summaries)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cold-start benchmark: each run is a fresh interpreter that imports src.bot,
+builds BobBot and runs its setup_hook (everything before the gateway login).
+Reports import time and time-to-ready, which optional modules were loaded by
+then, and whether importing alone touched the disk.
+
+Runs in a scratch working directory, so the repo's data/ is never used.
+
+Run from the repo root:  python -m benchmarks.bench_startup [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules that should only load when their feature is first used
+OPTIONAL = ["edge_tts", "src.voice", "src.audio_cache", "puter", "src.puter_client",
+            "groq", "src.llm_client", "difflib", "aiohttp.web"]
+
+PROBE = """
+import asyncio, json, os, sys, time
+start = time.perf_counter()
+from src.bot import BobBot
+imported = time.perf_counter()
+touched_disk = os.path.exists("data")
+
+async def ready():
+    bot = BobBot()
+    await bot.setup_hook()
+    ready = time.perf_counter()
+    loaded = [m for m in OPTIONAL if m in sys.modules]
+    warmup = getattr(bot, "_warmup", None)
+    if warmup is not None:
+        warmup.cancel()
+    await bot.tiers.close()
+    return ready, loaded
+
+ready, loaded = asyncio.run(ready())
+print(json.dumps({"import": imported - start, "ready": ready - start, "loaded": loaded, "touched_disk": touched_disk}))
+"""
+
+def probe(root: Path, cwd: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(root), BOB_METRICS_PORT="0")
+    code = f"OPTIONAL = {OPTIONAL!r}\n{PROBE}"
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    root = Path(__file__).resolve().parent.parent
+    results = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            results.append(probe(root, tmp))
+
+    for key, label in (("import", "import src.bot"), ("ready", "time-to-ready")):
+        times = sorted(r[key] * 1000 for r in results)
+        print(f"{label:<16} median {statistics.median(times):7.1f} ms   min {times[0]:7.1f} ms   max {times[-1]:7.1f} ms")
+    loaded = sorted({m for r in results for m in r["loaded"]})
+    print(f"{'optional loaded':<16} {', '.join(loaded) or 'none'}")
+    print(f"{'import wrote data/':<16} {any(r['touched_disk'] for r in results)}")
+
+if __name__ == "__main__":
+    main()
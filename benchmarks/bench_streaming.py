@@ -0,0 +1,81 @@
+"""
+Time-to-first-visible-text: wait-for-full-completion vs. StreamingReply.
+
+A mock provider emits a realistic reply token by token (first-token latency
+plus a steady inter-token delay); a fake channel records when text appears.
+
+Run from the repo root:  python -m benchmarks.bench_streaming
+"""
+import asyncio
+import statistics
+import time
+
+from src.streaming import StreamingReply, finalize_text
+
+REPLY = (
+    "Bruh, you really thought that was gonna work? 😎 Look, the vibe in here is immaculate "
+    "and you're out here asking me to do your homework. Tell you what, I'll give you one hint: "
+    "read the question twice before you panic. Works every time. 🔥"
+)
+FIRST_TOKEN_LATENCY = 0.35
+TOKEN_DELAY = 0.02
+RUNS = 5
+
+class FakeMessage:
+    def __init__(self, channel, content):
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, content):
+        self.channel.edits += 1
+        self.content = content
+
+    async def delete(self):
+        pass
+
+class FakeChannel:
+    def __init__(self):
+        self.first_text_at = None
+        self.edits = 0
+
+    async def send(self, content):
+        if self.first_text_at is None:
+            self.first_text_at = time.perf_counter()
+        return FakeMessage(self, content)
+
+async def mock_stream(text: str):
+    await asyncio.sleep(FIRST_TOKEN_LATENCY)
+    for word in text.split(" "):
+        yield word + " "
+        await asyncio.sleep(TOKEN_DELAY)
+
+async def full_completion(text: str) -> str:
+    return "".join([chunk async for chunk in mock_stream(text)])
+
+async def run_blocking() -> float:
+    channel = FakeChannel()
+    start = time.perf_counter()
+    await channel.send(finalize_text(await full_completion(REPLY)))
+    return channel.first_text_at - start
+
+async def run_streaming():
+    channel = FakeChannel()
+    reply = StreamingReply(channel)
+    start = time.perf_counter()
+    raw = await reply.consume(mock_stream(REPLY))
+    await reply.finish(finalize_text(raw))
+    return channel.first_text_at - start, time.perf_counter() - start, channel.edits
+
+async def main():
+    blocking = [await run_blocking() for _ in range(RUNS)]
+    streaming = [await run_streaming() for _ in range(RUNS)]
+
+    print(f"reply: {len(REPLY.split())} tokens, first token after {FIRST_TOKEN_LATENCY * 1000:.0f} ms, "
+          f"{TOKEN_DELAY * 1000:.0f} ms/token")
+    print(f"blocking  time-to-first-visible-text  {statistics.median(blocking) * 1000:8.1f} ms")
+    print(f"streaming time-to-first-visible-text  {statistics.median(s[0] for s in streaming) * 1000:8.1f} ms")
+    print(f"streaming time-to-final-text          {statistics.median(s[1] for s in streaming) * 1000:8.1f} ms "
+          f"({statistics.median(s[2] for s in streaming):.0f} edits)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
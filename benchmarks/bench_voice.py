@@ -0,0 +1,77 @@
+"""
+Time-to-first-audio for BobVoice: synthesize-to-temp-file-then-play vs. the AudioPipe stream.
+
+A mock edge-tts Communicate emits MP3-sized chunks with realistic pacing; a
+reader thread stands in for discord.py's FFmpeg pipe writer and records when
+the first bytes reach "FFmpeg". Runs offline, no FFmpeg needed.
+
+Run from the repo root:  python -m benchmarks.bench_voice
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from src.voice import AudioPipe
+
+FIRST_CHUNK_LATENCY = 0.25  # Websocket handshake + first synthesis
+CHUNK_INTERVAL = 0.03
+CHUNKS = 60  # ~3s of speech
+CHUNK_BYTES = 1440
+RUNS = 5
+
+class MockCommunicate:
+    async def stream(self):
+        await asyncio.sleep(FIRST_CHUNK_LATENCY)
+        for _ in range(CHUNKS):
+            yield {"type": "audio", "data": b"\xff" * CHUNK_BYTES}
+            await asyncio.sleep(CHUNK_INTERVAL)
+
+    async def save(self, path):
+        with open(path, "wb") as audio:
+            async for chunk in self.stream():
+                audio.write(chunk["data"])
+
+async def legacy_ttfa(tmp_dir: str) -> float:
+    start = time.perf_counter()
+    path = os.path.join(tmp_dir, "bob_voice_1.mp3")
+    await MockCommunicate().save(path)
+    # FFmpeg can only start once the file is complete
+    with open(path, "rb") as f:
+        f.read(8192)
+    return time.perf_counter() - start
+
+async def pipe_ttfa() -> float:
+    pipe = AudioPipe()
+    first_read = []
+
+    def ffmpeg_stdin_writer():
+        while True:
+            data = pipe.read(8192)
+            if not data:
+                return
+            if not first_read:
+                first_read.append(time.perf_counter())
+
+    start = time.perf_counter()
+    reader = threading.Thread(target=ffmpeg_stdin_writer, daemon=True)
+    reader.start()
+    async for chunk in MockCommunicate().stream():
+        pipe.feed(chunk["data"])
+    pipe.close_writer()
+    await asyncio.get_running_loop().run_in_executor(None, reader.join)
+    return first_read[0] - start
+
+async def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = [await legacy_ttfa(tmp) for _ in range(RUNS)]
+    piped = [await pipe_ttfa() for _ in range(RUNS)]
+
+    print(f"{CHUNKS} chunks, first after {FIRST_CHUNK_LATENCY * 1000:.0f} ms, one every {CHUNK_INTERVAL * 1000:.0f} ms")
+    print(f"temp file then play  time-to-first-audio {statistics.median(legacy) * 1000:8.1f} ms")
+    print(f"AudioPipe stream     time-to-first-audio {statistics.median(piped) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,24 +1,22 @@
 import os
-import asyncio
 from dotenv import load_dotenv
-from src.bot import BobBot
+from src.launcher import launch
 
 # Load environment variables
 load_dotenv()
 
-async def main():
+def main():
     token = os.getenv('DISCORD_TOKEN')
     if not token:
         print("Error: DISCORD_TOKEN not found in .env")
         return
 
-    bot = BobBot()
-    async with bot:
-        await bot.start(token)
+    # BOB_SHARD_MODE=single|auto|process picks one connection, one sharded client, or a worker per core
+    launch(token)
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         # Handle Ctrl+C gracefully
         pass
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import discord
+from discord.oggparse import OggStream
+
+logger = logging.getLogger("AudioCache")
+
+CACHE_DIR = Path("data") / "tts_cache"
+
+# 48 kHz stereo Opus in Ogg, the packet format the voice socket takes, so cached packets are sent as-is.
+# Lighter than FFmpegOpusAudio's defaults (128k, in-band FEC): 64k is plenty for speech and halves the cache.
+TRANSCODE_ARGS = (
+    "-loglevel", "error", "-f", "mp3", "-i", "pipe:0",
+    "-map_metadata", "-1", "-c:a", "libopus", "-b:a", "64k", "-ar", "48000", "-ac", "2",
+    "-f", "ogg", "pipe:1",
+)
+
+def clip_key(text: str, voice_name: str) -> str:
+    return hashlib.sha256(f"{voice_name}\n{text}".encode()).hexdigest()
+
+class OpusClip(discord.AudioSource):
+    """Plays a cached Ogg Opus clip straight to the voice socket, no FFmpeg process."""
+
+    def __init__(self, data: bytes):
+        self._packets = OggStream(io.BytesIO(data)).iter_packets()
+
+    def is_opus(self) -> bool:
+        return True
+
+    def read(self) -> bytes:
+        return next(self._packets, b"")
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized clips, keyed by sha256(voice + text).
+    Hot clips stay in memory; everything else lives in a size-capped directory
+    evicted least-recently-used first. Clips are stored as Ogg Opus, so a hit
+    skips both the edge-tts round trip and FFmpeg.
+    """
+
+    def __init__(self, path=CACHE_DIR, memory_bytes: int = 8 << 20, disk_bytes: int = 256 << 20, ffmpeg: str = "ffmpeg"):
+        self.path = Path(path)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.ffmpeg = ffmpeg
+        self._memory = OrderedDict()  # key -> ogg bytes, least recently used first
+        self._memory_size = 0
+        self._disk = None  # key -> file size, least recently used first; scanned on first use
+        self._disk_size = 0
+        # One worker: disk index updates and file operations never race
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-cache")
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.bytes_saved = 0  # Clip bytes served from cache instead of synthesized
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.ogg"
+
+    def _scan(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        files = sorted(self.path.glob("*.ogg"), key=lambda f: f.stat().st_mtime)
+        self._disk = OrderedDict((f.stem, f.stat().st_size) for f in files)
+        self._disk_size = sum(self._disk.values())
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _read(self, key: str):
+        if self._disk is None:
+            self._scan()
+        if key not in self._disk:
+            return None
+        try:
+            data = self._file(key).read_bytes()
+        except OSError:
+            self._disk_size -= self._disk.pop(key)
+            return None
+        os.utime(self._file(key))  # Keeps LRU order across restarts
+        self._disk.move_to_end(key)
+        return data
+
+    def _write(self, key: str, data: bytes):
+        if self._disk is None:
+            self._scan()
+        tmp = self._file(key).with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(self._file(key))
+        self._disk_size += len(data) - self._disk.pop(key, 0)
+        self._disk[key] = len(data)
+        while self._disk_size > self.disk_bytes and self._disk:
+            evicted, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self._file(evicted).unlink(missing_ok=True)
+
+    async def get(self, key: str):
+        """Returns the Ogg Opus clip for key, or None."""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+        else:
+            data = await asyncio.get_running_loop().run_in_executor(self._executor, self._read, key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, data)
+        self.bytes_saved += len(data)
+        return data
+
+    async def put(self, key: str, mp3: bytes):
+        """Transcodes an edge-tts MP3 clip to Ogg Opus and stores it in both tiers."""
+        if not mp3 or not self.ffmpeg:
+            return
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.ffmpeg, *TRANSCODE_ARGS,
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            )
+            data, err = await process.communicate(mp3)
+        except OSError as e:
+            logger.warning(f"Cannot run FFmpeg, TTS cache stays read-only: {e}")
+            self.ffmpeg = None
+            return
+        if process.returncode != 0 or not data:
+            logger.warning(f"Transcoding TTS clip failed: {err.decode(errors='replace').strip()}")
+            return
+        self._remember(key, data)
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write, key, data)
+        except OSError as e:
+            logger.warning(f"Cannot write TTS cache entry: {e}")
+        self.stores += 1
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "stores": self.stores,
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk_size,
+            "disk_entries": len(self._disk) if self._disk is not None else 0,
+        }
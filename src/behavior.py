@@ -0,0 +1,185 @@
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("Behavior")
+
+# Scanned once per message; both patterns are compiled at import
+_RESPECT = re.compile(r"\b(?:thanks|thank you|thx|ty|please|pls|respect|gg|goat|legend|good bot|love you)\b", re.IGNORECASE)
+_INSULT = re.compile(
+    r"\b(?:stupid|idiot|dumb|trash|garbage|useless|shut up|stfu|loser|clown|moron|bad bot|kys)\b", re.IGNORECASE,
+)
+SCAN_CHARS = 400  # Longer messages are scored on their start; walls of text don't get a bigger say
+
+class _UserScore:
+    __slots__ = ("score", "updated", "last_at", "last_digest", "tier")
+
+    def __init__(self, now: float):
+        self.score = 0.0
+        self.updated = now
+        self.last_at = 0.0
+        self.last_digest = None
+        self.tier = None  # Stored tier as of the last flush that looked at the user (None: not looked up yet)
+
+class BehaviorScorer:
+    """
+    Scores users from the messages Bob already sees and turns sustained
+    behavior into respect-tier changes.
+
+    Each user is one slotted record holding an exponentially decayed score
+    (half-life `half_life` seconds), updated in place per message: respect
+    words raise it, insults (doubly so when aimed at Bob), repeats, floods
+    and shouting lower it. Falling to `demote_at` queues Tier 3; recovering
+    to `restore_at` queues a return to Tier 2. Tier 1 is only ever set by
+    hand and is never touched, and only users this scorer demoted are ever
+    restored: the repository records its demotions, so a Tier 3 set by hand
+    stays put and the scorer's own demotions survive restarts and eviction.
+
+    Queued changes are written by flush(), one batched transaction on the
+    repository's DB thread; the message path only does arithmetic. Call
+    load() once at startup to pick up earlier demotions.
+    """
+
+    def __init__(self, repository, half_life: float = 86400.0, demote_at: float = -15.0, restore_at: float = -5.0,
+                 max_users: int = 100_000, flood_gap: float = 0.4, clock=time.monotonic):
+        self.repository = repository
+        self.decay = math.log(2) / half_life
+        self.demote_at = demote_at
+        self.restore_at = restore_at
+        self.max_users = max_users
+        self.flood_gap = flood_gap
+        self._clock = clock
+
+        self._users = OrderedDict()  # user_id -> _UserScore, least recently active first
+        self._pending = {}  # user_id -> tier to write on the next flush
+        self._demoted = set()  # Users this scorer moved to Tier 3 (mirrors the repository)
+
+        self.observed = 0
+        self.flushes = 0
+        self.tier_changes = 0
+        self.skipped_manual = 0
+        self.last_flush_ms = 0.0
+
+    def _delta(self, message, state: _UserScore, now: float, bot_id: int) -> float:
+        content = message.content[:SCAN_CHARS]
+        delta = 0.1  # Taking part at all is mildly positive
+
+        if _RESPECT.search(content):
+            delta += 1.0
+        if _INSULT.search(content):
+            aimed_at_bob = any(u.id == bot_id for u in message.mentions) or "bob" in content.lower()
+            delta -= 6.0 if aimed_at_bob else 3.0
+
+        digest = hash(content)
+        if digest == state.last_digest and len(content) >= 8:  # "lol" twice is chat; a pasted line twice is spam
+            delta -= 1.0
+        elif now - state.last_at < self.flood_gap:  # Faster than anyone types
+            delta -= 0.5
+        state.last_digest = digest
+        state.last_at = now
+
+        if len(content) >= 12:
+            letters = sum(c.isalpha() for c in content)
+            if letters >= 10 and sum(c.isupper() for c in content) > 0.7 * letters:
+                delta -= 0.5
+        return delta
+
+    def observe(self, message, bot_id: int = None):
+        """Folds one message into its author's score. Pure in-memory work."""
+        now = self._clock()
+        user_id = message.author.id
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = _UserScore(now)
+            if len(self._users) > self.max_users:
+                evicted, _ = self._users.popitem(last=False)
+                self._pending.pop(evicted, None)
+        else:
+            self._users.move_to_end(user_id)
+            state.score *= math.exp(-self.decay * (now - state.updated))
+        state.updated = now
+        state.score += self._delta(message, state, now, bot_id)
+        self.observed += 1
+
+        demoted = user_id in self._demoted
+        if state.score <= self.demote_at and not demoted and state.tier not in (1, 3):
+            self._pending[user_id] = 3
+        elif state.score >= self.restore_at and demoted:
+            self._pending[user_id] = 2
+        else:
+            self._pending.pop(user_id, None)  # Bounced back before the flush: nothing to write
+
+    def score(self, user_id) -> float:
+        state = self._users.get(user_id)
+        if state is None:
+            return 0.0
+        return state.score * math.exp(-self.decay * (self._clock() - state.updated))
+
+    async def load(self):
+        """Reads which users earlier runs demoted, so they can still be restored."""
+        self._demoted = {int(user_id) for user_id in await self.repository.get_behavior_demotions()}
+        if self._demoted:
+            logger.info(f"{len(self._demoted)} users are in Tier 3 from behavior scoring")
+
+    async def flush(self) -> int:
+        """Writes queued tier changes in one transaction. Returns how many tiers changed."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        started = time.perf_counter()
+        try:
+            current = await self.repository.get_tiers(pending)
+            # Read back rather than trusted from memory: a tier set by hand since then clears the mark
+            ours = await self.repository.get_behavior_demotions(u for u, tier in pending.items() if tier == 2)
+            changes = {}
+            for user_id, tier in pending.items():
+                key = str(user_id)
+                stored = current[key]
+                if tier == 3 and stored == 2:
+                    changes[user_id] = 3
+                elif tier == 2 and stored == 3 and key in ours:
+                    changes[user_id] = 2
+                elif tier == 3 or key not in ours:
+                    self.skipped_manual += 1  # Tier 1, or a tier set by hand: never the scorer's call
+            await self.repository.apply_behavior(changes)
+        except BaseException as e:
+            # Failed or cancelled mid-flush: requeue, unless newer messages already changed the verdict
+            for user_id, tier in pending.items():
+                self._pending.setdefault(user_id, tier)
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"Tier flush failed, retrying next time: {e}")
+            return 0
+
+        for user_id, tier in pending.items():
+            if tier == 2 and str(user_id) not in ours:
+                self._demoted.discard(user_id)  # Set by hand since; no longer ours to restore
+            state = self._users.get(user_id)
+            if state is not None:
+                state.tier = changes.get(user_id, current[str(user_id)])
+        for user_id, tier in changes.items():
+            if tier == 3:
+                self._demoted.add(user_id)
+            else:
+                self._demoted.discard(user_id)
+        self.flushes += 1
+        self.tier_changes += len(changes)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        if changes:
+            logger.info(f"Updated {len(changes)} respect tiers from behavior "
+                        f"({sum(t == 3 for t in changes.values())} to Tier 3)")
+        return len(changes)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._users),
+            "observed": self.observed,
+            "pending": len(self._pending),
+            "demoted": len(self._demoted),
+            "flushes": self.flushes,
+            "tier_changes": self.tier_changes,
+            "skipped_manual": self.skipped_manual,
+            "last_flush_ms": self.last_flush_ms,
+        }
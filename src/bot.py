@@ -1,65 +1,232 @@
 import discord
 import logging
 import asyncio
+import os
 import random
-import re
-import difflib
-from src.puter_client import PuterClient
-from src.voice import BobVoice
-from src.database import get_user_tier, update_user_tier
+from collections import OrderedDict
+from src.database import RespectRepository, tier_cache
+from src.message_cache import MessageCache
+from src.context_window import ContextWindow
+from src.debounce import AdaptiveDebouncer
+from src.name_index import NameIndex
+from src.prompt_builder import PromptBuilder
+from src.response_cache import ResponseCache, QuickReplies, SharedResponseStore
+from src.providers import build_router, ProviderError
+from src.metrics import Metrics, LogSampler
+from src.relevance import RelevanceGate
+from src.behavior import BehaviorScorer
+from src.snapshot import SnapshotStore
+from src.tx import TxFanout, parse_command_targets, parse_tool_calls
+from src.outbound import OutboundDispatcher, LANE_BOSS, LANE_REPLY, LANE_NOTICE
+from src.streaming import StreamingReply, finalize_text
+from src.scheduler import (
+    GenerationScheduler, SchedulerRejected,
+    PRIORITY_BOSS, PRIORITY_DM, PRIORITY_CHANNEL, PRIORITY_BUSY_CHANNEL,
+)
 
 logger = logging.getLogger("BobBot")
+BOSS_USER_ID = 1026865113694740490
+sampled = LogSampler()  # Per-burst info lines, capped so they stay cheap at high message rates
 
 class BobBot(discord.Client):
-    def __init__(self):
+    def __init__(self, **options):
         intents = discord.Intents.default()
         intents.message_content = True
-        super().__init__(intents=intents)
+        super().__init__(intents=intents, **options)
         
-        self.llm = PuterClient()
-        self.voice = BobVoice(self)
-        self.msg_history_limit = 10
-        self.debounce_timers = {}
+        self.prompts = PromptBuilder()
+        self.names = NameIndex()
+        self.llm = build_router(prompts=self.prompts)
+        # Shard workers share cached replies through SQLite; a single process keeps them in memory
+        shared_store = SharedResponseStore() if os.getenv("BOB_SHARED_RESPONSES", "0") == "1" else None
+        self.response_cache = ResponseCache(ttl=float(os.getenv("BOB_RESPONSE_CACHE_TTL", "600")), store=shared_store)
+        self.quick_replies = QuickReplies() if os.getenv("BOB_QUICK_REPLIES", "0") == "1" else None
+        self._voice = None  # Created on first use; edge-tts and the TTS cache stay unloaded until then
+        self.tiers = RespectRepository()
+        # Opt-in (BOB_BEHAVIOR_SCORING=1): tiers follow behavior, scored per message in memory and written
+        # in batches by _flush_behavior. It rewrites stored tiers, so it stays off until enabled on purpose.
+        self.behavior = BehaviorScorer(
+            self.tiers, half_life=float(os.getenv("BOB_BEHAVIOR_HALF_LIFE", "86400")),
+        ) if os.getenv("BOB_BEHAVIOR_SCORING", "0") == "1" else None
+        self.behavior_flush_interval = float(os.getenv("BOB_BEHAVIOR_FLUSH_INTERVAL", "30"))
+        # Candidate messages per reply; the token budget decides how many are sent verbatim
+        self.msg_history_limit = 30
+        self.message_cache = MessageCache(per_channel=max(self.msg_history_limit, 50))
+        self.context_window = ContextWindow()
+        # Drops traffic that can't be for Bob before it costs a burst, a history fetch and a provider call
+        self.relevance = RelevanceGate(boss_id=BOSS_USER_ID)
+        # Bursts are coalesced per channel, then answered by one task in reply_tasks
+        self.debouncer = AdaptiveDebouncer(
+            self._dispatch_burst,
+            max_wait=float(os.getenv("BOB_DEBOUNCE_MAX_WAIT", "8")),
+        )
+        self.reply_tasks = {}  # channel_id -> the one reply in flight (single-flight per channel)
+        # A newer burst cancels the running reply ("cancel") or waits for it and runs next ("follow_up").
+        # After max_supersede cancels in a row the running reply is allowed to finish, so busy channels still get answers.
+        self.supersede_policy = os.getenv("BOB_SUPERSEDE", "cancel")
+        self.max_supersede = int(os.getenv("BOB_MAX_SUPERSEDE", "3"))
+        self._supersede_streak = {}  # channel_id -> replies cancelled or dropped in a row
+        self._follow_ups = set()  # channel_ids with a burst waiting for the in-flight reply
+        self._committed = set()  # channel_ids whose in-flight reply is past its stale check and being delivered
+        # channel_id -> newest user message a delivered reply covered, least recently answered first;
+        # capped like the message cache (a forgotten channel falls back to "did Bob speak last")
+        self._answered = OrderedDict()
+        self.streaming = os.getenv("BOB_STREAMING", "0") == "1"
+        self.scheduler = GenerationScheduler(
+            max_inflight=int(os.getenv("BOB_MAX_INFLIGHT", "4")),
+            max_queue=int(os.getenv("BOB_MAX_QUEUE", "64")),
+        )
+        # Every send and reaction is paced per channel route here instead of racing into 429s
+        self.outbound = OutboundDispatcher(max_pending=int(os.getenv("BOB_OUTBOUND_MAX_PENDING", "50")))
+        # [[TX]] and !tx deliver to all their targets as one concurrent batch
+        self.tx = TxFanout(
+            self, self.names, self.outbound,
+            concurrency=int(os.getenv("BOB_TX_CONCURRENCY", "8")),
+            max_targets=int(os.getenv("BOB_TX_MAX_TARGETS", "25")),
+        )
+        # Hot state survives restarts: context, pending bursts and tiers come back from a local snapshot
+        self.snapshots = SnapshotStore(
+            max_age=float(os.getenv("BOB_SNAPSHOT_MAX_AGE", "600")),
+        ) if os.getenv("BOB_SNAPSHOT", "1") == "1" else None
+        self.snapshot_interval = float(os.getenv("BOB_SNAPSHOT_INTERVAL", "300"))
+        self.metrics = Metrics()
+        self.metrics.register("bot", self.stats)
+        self._warmup = None
+        self._behavior_task = None
+        self._snapshot_task = None
+        self._restored_bursts = None  # Channel ids to re-arm once the gateway is ready
+
+    @property
+    def voice(self):
+        if self._voice is None:
+            from src.voice import BobVoice
+            self._voice = BobVoice(self)
+        return self._voice
+
+    async def setup_hook(self):
+        # The schema is created here, once, rather than when src.database is imported
+        await self.tiers.open()
+        if self.snapshots:
+            if self.snapshots.load():
+                for key, tier, ttl in self.snapshots.take_tiers():
+                    self.tiers.cache.set(key, tier, ttl)
+                self._restored_bursts = self.snapshots.take_bursts()
+            self._snapshot_task = asyncio.create_task(self._save_snapshots())
+        # Load the primary provider's SDK in the background while the gateway connects
+        self._warmup = asyncio.create_task(self.llm.warm())
+        if self.behavior:
+            await self.behavior.load()
+            self._behavior_task = asyncio.create_task(self._flush_behavior())
+        metrics_port = int(os.getenv("BOB_METRICS_PORT", "0"))
+        if metrics_port:
+            await self.metrics.start_server(os.getenv("BOB_METRICS_HOST", "127.0.0.1"), metrics_port)
+
+    async def close(self):
+        if self._snapshot_task:
+            self._snapshot_task.cancel()
+            await self.save_snapshot()  # Before anything is torn down
+        await self.outbound.close()
+        await super().close()
+        await self.metrics.stop_server()
+        await self.llm.close()
+        if self._behavior_task:
+            self._behavior_task.cancel()
+            await self.behavior.flush()  # Last batch before the DB closes
+        await self.tiers.close()
+        await self.response_cache.close()
+        if self.snapshots:
+            self.snapshots.close()
+
+    async def _flush_behavior(self):
+        while True:
+            await asyncio.sleep(self.behavior_flush_interval)
+            await self.behavior.flush()
+
+    async def _save_snapshots(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.save_snapshot()
+
+    async def save_snapshot(self):
+        # Channels that would have been answered had Bob stayed up
+        bursts = [*self.debouncer.pending_channels(), *self.reply_tasks, *self._follow_ups]
+        try:
+            await self.snapshots.save(self.message_cache, self.context_window, self.tiers.cache, bursts)
+        except Exception as e:
+            logger.error(f"Snapshot save failed: {e}")
+
+    def stats(self) -> dict:
+        """Counters from every hot-path component, for logging and metrics."""
+        quick = self.quick_replies.stats() if self.quick_replies else {"silenced": 0, "canned": 0}
+        response_cache = self.response_cache.stats()
+        return {
+            "message_cache": self.message_cache.stats(),
+            "tier_cache": tier_cache.stats(),
+            "scheduler": self.scheduler.stats(),
+            "providers": self.llm.stats(),
+            "prompts": self.prompts.stats(),
+            "context_window": self.context_window.stats(),
+            "names": self.names.stats(),
+            "relevance": self.relevance.stats(),
+            "behavior": self.behavior.stats() if self.behavior else None,
+            "debounce": self.debouncer.stats(),
+            "outbound": self.outbound.stats(),
+            "tx": self.tx.stats(),
+            "snapshot": self.snapshots.stats() if self.snapshots else None,
+            "voice": self._voice.stats() if self._voice else None,
+            "response_cache": response_cache,
+            "quick_replies": quick,
+            "provider_calls_saved": (response_cache["hits"] + quick["silenced"] + quick["canned"]
+                                     + self.relevance.calls_saved),
+        }
 
     async def on_ready(self):
+        self.names.rebuild(self.guilds)
         logger.info(f'Logged in as {self.user} (ID: {self.user.id})')
         logger.info('Bob is ready on the street.')
+        if self._restored_bursts is not None:
+            bursts, self._restored_bursts = self._restored_bursts, None
+            self.snapshots.discard_stale(self.get_channel)
+            for channel_id in bursts:
+                channel = self.get_channel(channel_id)
+                if channel is not None:
+                    self.debouncer.touch(channel)
 
     async def on_message(self, message):
+        # Every message (including our own replies) feeds the channel cache
+        self.message_cache.add(message)
+
         # 0. Debug Log - Receive Message
         if message.author == self.user:
+            self.relevance.note_own_message(message)
             return
 
-        logger.info(f"Received message from {message.author}: {message.content}")
-
         # 1. COMMANDS (Priority High)
-        BOSS_USER_ID = 1026865113694740490
-        
         if message.content.startswith("!tx"):
             if message.author.id != BOSS_USER_ID:
                 logger.warning(f"Unauthorized !tx attempt by {message.author}")
                 return 
 
             try:
-                # Format: !tx <channel_id> <message>
+                # Format: !tx <channel_id>[,<channel_id>|@group...] <message>
                 parts = message.content.split(" ", 2)
                 if len(parts) < 3:
-                    await message.channel.send("Usage: `!tx <channel_id> <message>`")
+                    await self.outbound.send(message.channel, "Usage: `!tx <channel_id>[,<channel_id>|@group...] <message>`", LANE_BOSS)
                     return
                 
-                target_channel_id = int(parts[1])
+                targets = parse_command_targets(parts[1])
                 content_to_send = parts[2]
                 
-                target_channel = self.get_channel(target_channel_id) or await self.fetch_channel(target_channel_id)
+                results = await self.tx.send([(targets, content_to_send)], origin_guild=message.guild, lane=LANE_BOSS)
                 
-                if target_channel:
-                    await target_channel.send(content_to_send)
-                    await message.channel.send(f"✅ Sent to {target_channel.name} (`{target_channel_id}`)")
-                    logger.info(f"Boss sent remote message to {target_channel_id}: {content_to_send}")
+                if len(results) == 1 and results[0].ok:
+                    target_channel = results[0].channel
+                    await self.outbound.send(message.channel, f"✅ Sent to {target_channel.name} (`{target_channel.id}`)", LANE_BOSS)
                 else:
-                    await message.channel.send(f"❌ Could not find channel `{target_channel_id}`")
+                    await self.outbound.send(message.channel, self.tx.summary(results), LANE_BOSS)
+                logger.info(f"Boss sent remote message to {parts[1]}: {content_to_send}")
             except Exception as e:
-                await message.channel.send(f"❌ Error: {e}")
+                await self.outbound.send(message.channel, f"❌ Error: {e}", LANE_BOSS)
                 logger.error(f"Command Error: {e}")
             
             return 
@@ -68,155 +235,315 @@ class BobBot(discord.Client):
         if not message.content:
             return
 
-        # 3. Debounce / Message Coalescing Logic
+        # Every message counts toward its author's behavior score, whether or not Bob answers it
+        if self.behavior and not message.author.bot and message.author.id != BOSS_USER_ID:
+            self.behavior.observe(message, self.user.id)
+
+        # 3. Relevance gate: most traffic in big servers isn't for Bob
         channel_id = message.channel.id
-        if channel_id in self.debounce_timers:
-            self.debounce_timers[channel_id].cancel()
-            logger.info(f"Debounce: Resetting timer for channel {channel_id}")
-        
-        # Start new timer (Wait 2.0s for user to finish typing)
-        # We store the task so we can cancel it if another message comes in
-        self.debounce_timers[channel_id] = asyncio.create_task(self.process_channel_response(message.channel))
+        busy = self.debouncer.pending(channel_id) or channel_id in self.reply_tasks
+        if not self.relevance.admit(message, self.user.id, busy):
+            return
+        logger.debug("Received message from %s in channel %s", message.author, message.channel.id)
+
+        # 4. Debounce / Message Coalescing Logic
+        if self.debouncer.pending(channel_id):
+            self.metrics.inc("debounce_resets")
+            logger.debug("Debounce: Extending burst for channel %s", channel_id)
+
+        # Mentions and the Boss skip the quiet window; everyone else is coalesced into one burst
+        urgent = message.author.id == BOSS_USER_ID or any(u.id == self.user.id for u in message.mentions)
+        self.debouncer.touch(message.channel, urgent=urgent)
+
+    def _dispatch_burst(self, channel):
+        running = self.reply_tasks.get(channel.id)
+        if running is not None and not running.done():
+            streak = self._supersede_streak.get(channel.id, 0)
+            if self.supersede_policy != "cancel" or streak >= self.max_supersede or channel.id in self._committed:
+                # Let the running reply finish (a committed one may be mid-send or mid-TX and is never cut off);
+                # this burst runs right after it, with the fuller history
+                self._follow_ups.add(channel.id)
+                self.metrics.inc("follow_ups")
+                return
+            # Cancelling frees the scheduler slot and aborts the provider request
+            self._supersede_streak[channel.id] = streak + 1
+            running.cancel()
+            self.metrics.inc("generations_superseded")
+        self.reply_tasks[channel.id] = asyncio.create_task(self.process_channel_response(channel))
+
+    def _reply_finished(self, channel):
+        """Releases the channel's single-flight slot and starts a follow-up burst if one is waiting."""
+        if self.reply_tasks.get(channel.id) is not asyncio.current_task():
+            return  # Superseded: the newer task owns the slot now
+        del self.reply_tasks[channel.id]
+        self._committed.discard(channel.id)
+        if channel.id in self._follow_ups:
+            self._follow_ups.discard(channel.id)
+            self.reply_tasks[channel.id] = asyncio.create_task(self.process_channel_response(channel))
+
+    async def on_typing(self, channel, user, when):
+        if not user.bot:
+            self.debouncer.typing(channel.id)
+
+    async def on_raw_message_edit(self, payload):
+        self.message_cache.update(payload.message)
+
+    async def on_raw_message_delete(self, payload):
+        self.message_cache.remove(payload.channel_id, [payload.message_id])
+
+    async def on_raw_bulk_message_delete(self, payload):
+        self.message_cache.remove(payload.channel_id, payload.message_ids)
+
+    async def on_guild_channel_create(self, channel):
+        self.prompts.invalidate_guild(channel.guild.id)
+        if isinstance(channel, discord.TextChannel):
+            self.names.add_channel(channel)
+
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name or before.position != after.position:
+            self.prompts.invalidate_guild(after.guild.id)
+            if isinstance(after, discord.TextChannel):
+                self.names.update_channel(before, after)
+
+    async def on_guild_channel_delete(self, channel):
+        self.message_cache.remove_channel(channel.id)
+        self.debouncer.cancel(channel.id)
+        self.relevance.forget_channel(channel.id)
+        self.context_window.forget(channel.id)
+        self._answered.pop(channel.id, None)
+        self.prompts.invalidate_guild(channel.guild.id)
+        if isinstance(channel, discord.TextChannel):
+            self.names.remove_channel(channel)
+
+    async def on_guild_join(self, guild):
+        self.names.add_guild(guild)
+
+    async def on_guild_update(self, before, after):
+        self.prompts.invalidate_guild(after.id)
+        self.names.update_guild(before, after)
+
+    async def on_guild_remove(self, guild):
+        self.prompts.invalidate_guild(guild.id)
+        self.names.remove_guild(guild)
+
+    async def _get_history(self, channel) -> list:
+        """Recent messages (oldest first) from the cache, priming it from the snapshot or the API on a cold channel."""
+        history = self.message_cache.get(channel.id, self.msg_history_limit)
+        if history is not None:
+            return history
+
+        restored = self.snapshots.restore_channel(channel) if self.snapshots else None
+        if restored is not None:
+            messages, summary = restored
+            if summary:
+                self.context_window.restore(channel.id, *summary)
+            self.message_cache.prime(channel.id, messages)
+            return self.message_cache.get(channel.id, self.msg_history_limit) or messages
+
+        fetched = [msg async for msg in channel.history(limit=self.msg_history_limit)]
+        fetched.reverse()
+        self.message_cache.prime(channel.id, fetched)
+        return self.message_cache.get(channel.id, self.msg_history_limit) or fetched
+
+    def _generation_priority(self, channel, history, user_tier) -> int:
+        """Boss/Tier 1 first, then DMs, then public channels, with busy channels last."""
+        if user_tier == 1:
+            return PRIORITY_BOSS
+        if channel.guild is None:
+            return PRIORITY_DM
+        # Ten messages inside one minute means the channel is busy
+        recent = history[-10:]
+        if len(recent) >= 10 and (recent[-1].created_at - recent[0].created_at).total_seconds() < 60:
+            return PRIORITY_BUSY_CHANNEL
+        return PRIORITY_CHANNEL
+
+    def _unanswered(self, channel_id, history):
+        """
+        (history, newest user message) for a run, or None if every user message
+        has been answered. Bob's replies that landed after newer messages (the
+        run that follows a committed reply) are moved back to just after what
+        they answered, so the open messages come last.
+        """
+        last_user_msg = next((m for m in reversed(history) if m.author.id != self.user.id), None)
+        if last_user_msg is None:
+            return None
+        answered = self._answered.get(channel_id)
+        if answered is None:
+            # Nothing delivered since startup: Bob speaking last means the burst was answered
+            return None if history[-1].author.id == self.user.id else (history, last_user_msg)
+        if last_user_msg.id <= answered:
+            return None
+        late = [m for m in history if m.id > answered and m.author.id == self.user.id]
+        if late:
+            history = ([m for m in history if m.id <= answered] + late
+                       + [m for m in history if m.id > answered and m.author.id != self.user.id])
+        return history, last_user_msg
+
+    def _is_superseded(self, channel_id, last_user_msg) -> bool:
+        """True if someone other than Bob has posted in the channel since this burst was read."""
+        newest = self.message_cache.latest(channel_id)
+        return newest is not None and newest.id > last_user_msg.id and newest.author.id != self.user.id
+
+    def _is_outdated(self, channel_id, last_user_msg) -> bool:
+        """True if this run should give way to a newer burst instead of answering."""
+        if self.supersede_policy != "cancel" or self._supersede_streak.get(channel_id, 0) >= self.max_supersede:
+            return False  # Follow-ups answer what came later; this reply still goes out
+        # A pending burst will dispatch (and cancel us) soon; only then is there a newer reply to give way to
+        return self.debouncer.pending(channel_id) and self._is_superseded(channel_id, last_user_msg)
 
     async def process_channel_response(self, channel):
-        """Waits for silence, then processes the chat context."""
+        """Answers a channel's burst once the debouncer has seen it go quiet."""
+        reply = None
+        committed = False
         try:
-            await asyncio.sleep(2.0) # Wait for users to stop typing
-            
-            # Fetch fresh history including all the new messages
+            # Fresh history including all the new messages (cached; API only on a cold channel)
             try:
-                history = [msg async for msg in channel.history(limit=self.msg_history_limit)]
-                history.reverse()
+                with self.metrics.timer("stage_seconds", stage="history"):
+                    history = await self._get_history(channel)
             except Exception as e:
                 logger.error(f"Error fetching history: {e}")
                 return
 
-            # Analyze the last few messages to find the Primary User (who started this burst)
-            # Simple heuristic: last user who isn't bot
-            last_user_msg = next((m for m in reversed(history) if m.author != self.user), None)
-            if not last_user_msg:
-                return
+            # The Primary User is the last one who isn't Bob; only messages no delivered reply covered count
+            unanswered = self._unanswered(channel.id, history)
+            if unanswered is None:
+                return  # Nothing new since Bob last answered (e.g. a burst already covered by the previous run)
+            history, last_user_msg = unanswered
 
-            BOSS_USER_ID = 1026865113694740490
-            user_tier = get_user_tier(str(last_user_msg.author.id))
+            with self.metrics.timer("stage_seconds", stage="tier"):
+                user_tier = await self.tiers.get_tier(str(last_user_msg.author.id))
             
             if last_user_msg.author.id == BOSS_USER_ID:
-                logger.info(f"User {last_user_msg.author} is the BOSS! Forcing Tier 1.")
+                logger.debug("User %s is the BOSS! Forcing Tier 1.", last_user_msg.author)
                 user_tier = 1
 
             # Generate Response
-            logger.info(f"Processing batch for channel {channel.name}...")
-            
-            async with channel.typing():
-                # Gather Context Info
-                context_info = {
-                    "server_name": channel.guild.name if channel.guild else "DM",
-                    "channel_name": channel.name if hasattr(channel, 'name') else "DM",
-                    "visible_channels": [c.name for c in channel.guild.text_channels] if channel.guild else [],
-                    "available_servers": [g.name for g in self.guilds]
-                }
-                
-                response_text = await self.llm.generate_response(history, user_tier, context_info)
-            
+            sampled.log(logger, logging.INFO, "Processing batch for channel %s...", channel.name)
+
+            with self.metrics.timer("stage_seconds", stage="prompt"):
+                # Location context; the guild's channel list comes from the prompt builder's memo
+                context_info = self.prompts.context_info(channel)
+                # Newest turns verbatim within the token budget, older ones as a rolling summary
+                window, context_info["memory"] = self.context_window.build(channel.id, history, self.llm.history_budget())
+
+            # Fast paths: canned/silent answers and cached replies skip the provider entirely
+            response_text = self.quick_replies.classify(window, user_tier, self.user.id) if self.quick_replies else None
+            cache_key = self.response_cache.key(
+                window, user_tier, self.prompts.persona_digest, channel.id, context_info["memory"],
+            )
+            if response_text is None:
+                response_text = await self.response_cache.fetch(cache_key)
+
+            lane = LANE_BOSS if user_tier == 1 else LANE_REPLY
+            if response_text is None:
+                # Streaming mode shows the reply while it is generated instead of after; the preview is edited, so never merged
+                reply = StreamingReply(
+                    channel, send=lambda text: self.outbound.send(channel, text, lane, merge=False),
+                ) if self.streaming else None
+
+                async def generate():
+                    async with channel.typing():
+                        # Timed from slot grant, so scheduler queueing is not counted as provider time
+                        with self.metrics.timer("stage_seconds", stage="provider"):
+                            if reply:
+                                try:
+                                    raw = await reply.consume(self.llm.stream_response(window, user_tier, context_info))
+                                except ProviderError:
+                                    # Cut off mid-reply: the partial text is not the answer; grumble like a failed call (never cached)
+                                    return self.llm.error_reply
+                                return finalize_text(raw)
+                            return await self.llm.generate_response(window, user_tier, context_info)
+
+                # Wait for a generation slot; newer bursts for this channel replace this one
+                try:
+                    response_text = await self.scheduler.run(
+                        channel.id,
+                        self._generation_priority(channel, history, user_tier),
+                        generate,
+                        is_stale=lambda: self._is_outdated(channel.id, last_user_msg),
+                    )
+                except SchedulerRejected as e:
+                    if e.reason == "stale":
+                        self._supersede_streak[channel.id] = self._supersede_streak.get(channel.id, 0) + 1
+                    self.metrics.inc("generations_dropped", reason=e.reason)
+                    logger.info("Generation for channel %s dropped (%s).", channel.id, e.reason)
+                    return
+
+                if response_text != self.llm.error_reply:
+                    self.response_cache.put(cache_key, response_text)
+
+            # Someone spoke while we were generating: their burst gets a fresh reply, never this stale one
+            if self._is_outdated(channel.id, last_user_msg):
+                self._supersede_streak[channel.id] = self._supersede_streak.get(channel.id, 0) + 1
+                self.metrics.inc("stale_replies_dropped")
+                if reply:
+                    await reply.finish("")
+                return
+            self._supersede_streak.pop(channel.id, None)
+            # Past the point of no return: newer bursts now wait for this reply instead of cancelling a half-done send/TX
+            committed = True
+            self._committed.add(channel.id)
+            self._answered[channel.id] = last_user_msg.id
+            self._answered.move_to_end(channel.id)
+            if len(self._answered) > self.message_cache.max_channels:
+                self._answered.popitem(last=False)
+
             if response_text:
-                # Check for Tool usage
-                tool_match = re.search(r'\[\[TX:\s*(.*?)\s*\|\s*(.*?)\s*\|\s*(.*?)\]\]', response_text, flags=re.DOTALL)
-                tool_success = True
-                if tool_match:
-                    server_name, channel_name, msg_content = tool_match.groups()
-                    tool_success, target_channel_obj = await self._handle_tool_command(last_user_msg, server_name.strip(), channel_name.strip(), msg_content.strip())
-                    response_text = response_text.replace(tool_match.group(0), "").strip()
+                # Check for Tool usage (every [[TX]] block, each possibly with several targets)
+                tool_calls, stripped_text = parse_tool_calls(response_text)
+                if tool_calls:
+                    with self.metrics.timer("stage_seconds", stage="tool"):
+                        results = await self._handle_tool_calls(last_user_msg, tool_calls)
+                    response_text = stripped_text
                     
                     # Prevent Double Posting:
                     # If the tool successfully sent a message to the CURRENT channel, 
                     # we should not output the remaining text (which is likely a duplicate).
-                    if tool_success and target_channel_obj and target_channel_obj.id == channel.id:
+                    if any(r.ok and r.channel.id == channel.id for r in results):
                         logger.info("Tool targeted current channel. Suppressing duplicate text response.")
                         response_text = ""
-                
-                if response_text and (not tool_match or tool_success): 
-                    logger.info(f"Sending response: {response_text}")
-                    await channel.send(response_text)
+                    elif not any(r.ok for r in results):
+                        response_text = ""
+                with self.metrics.timer("stage_seconds", stage="send"):
+                    if reply:
+                        await reply.finish(response_text)
+                    if response_text and not reply:
+                        await self.outbound.send(channel, response_text, lane)
+                if response_text:
+                    self.metrics.inc("replies")
+                    logger.debug("Sending response: %s", response_text)
                     # Voice Output
                     if channel.guild.voice_client and channel.guild.voice_client.is_connected():
-                         await self.voice.speak(channel, response_text)
+                        with self.metrics.timer("stage_seconds", stage="tts"):
+                            await self.voice.speak(channel, response_text)
             else:
-                logger.info("LLM chose SILENCE.")
+                if reply:
+                    await reply.finish("")
+                self.metrics.inc("silences")
+                sampled.log(logger, logging.INFO, "LLM chose SILENCE.")
                 
         except asyncio.CancelledError:
-            # Timer was cancelled because a new message arrived
-            pass
+            # Superseded by a newer burst; take down any half-streamed preview (a committed reply is final)
+            if reply and not committed:
+                await reply.finish("")
         except Exception as e:
+            self.metrics.inc("errors", stage="process")
             logger.error(f"Error in process_channel_response: {e}")
+            if reply and not committed:
+                await reply.finish("")  # Don't leave a half-streamed preview behind
         finally:
-            # Cleanup timer key
-            if hasattr(self, 'debounce_timers') and channel.id in self.debounce_timers:
-                del self.debounce_timers[channel.id]
+            self._reply_finished(channel)
 
 
-    async def _handle_tool_command(self, ctx_message, server_name, channel_name, content):
-        """Executes the Natural Language TX command."""
-        logger.info(f"Attempting to send '{content}' to {server_name}/{channel_name}")
-        
-        # 1. Resolve Guild
-        target_guild = None
-        # Handle "current server" aliases
-        if server_name.lower() in ["this server", "current server", "here", getattr(ctx_message.guild, 'name', '').lower()]:
-             target_guild = ctx_message.guild
-        else:
-            # A. Exact Match
-            target_guild = discord.utils.get(self.guilds, name=server_name)
-            
-            # B. Case-Insensitive Match
-            if not target_guild:
-                for g in self.guilds:
-                    if g.name.lower() == server_name.lower():
-                        target_guild = g
-                        break
-            
-            # C. Fuzzy Match (The "Fix")
-            if not target_guild:
-                guild_names = [g.name for g in self.guilds]
-                matches = difflib.get_close_matches(server_name, guild_names, n=1, cutoff=0.5) # 0.5 allows for some typos
-                if matches:
-                    target_guild = discord.utils.get(self.guilds, name=matches[0])
-                    logger.info(f"Fuzzy matched server '{server_name}' -> '{target_guild.name}'")
-                    await ctx_message.channel.send(f"(whispering) Assuming you meant server '{target_guild.name}'...")
-        
-        if not target_guild:
-            logger.warning(f"Server '{server_name}' not found.")
-            await ctx_message.channel.send(f"(whispering) I couldn't find ANY server looking like '{server_name}', Boss. Try again?")
-            return False, None
-
-        # 2. Resolve Channel
-        target_channel = discord.utils.get(target_guild.text_channels, name=channel_name)
-        
-        # B. Case-Insensitive Match
-        if not target_channel:
-             for c in target_guild.text_channels:
-                 if c.name.lower() == channel_name.lower():
-                     target_channel = c
-                     break
-        
-        # C. Fuzzy Match
-        if not target_channel:
-             channel_names = [c.name for c in target_guild.text_channels]
-             matches = difflib.get_close_matches(channel_name, channel_names, n=1, cutoff=0.5)
-             if matches:
-                 target_channel = discord.utils.get(target_guild.text_channels, name=matches[0])
-                 logger.info(f"Fuzzy matched channel '{channel_name}' -> '{target_channel.name}'")
-                 await ctx_message.channel.send(f"(whispering) Assuming you meant channel '{target_channel.name}'...")
-        
-        if not target_channel:
-             logger.warning(f"Channel '{channel_name}' not found in {server_name}.")
-             await ctx_message.channel.send(f"(whispering) I found '{target_guild.name}', but no channel looking like '{channel_name}'.")
-             return False, None
+    async def _handle_tool_calls(self, ctx_message, calls):
+        """Executes the Natural Language TX command: all blocks and targets in one concurrent batch."""
+        logger.info(f"TX tool: {sum(len(targets) for targets, _ in calls)} targets in {len(calls)} blocks")
+        # One batch for the whole completion: one target limit, one concurrency cap, one dedup set
+        results = await self.tx.send(calls, origin_guild=ctx_message.guild)
 
-        try:
-            await target_channel.send(content)
-            await ctx_message.add_reaction("✅")
-            return True, target_channel
-        except Exception as e:
-            logger.error(f"Failed to send TX: {e}")
-            await ctx_message.channel.send(f"(whispering) Failed to send: {e}")
-            return False, None
+        # A clean run gets a ✅; fuzzy guesses or failures get one whispered summary instead of a notice each
+        if results and all(r.ok and not r.note for r in results):
+            await self.outbound.react(ctx_message, "✅")
+        else:
+            await self.outbound.send(ctx_message.channel, "(whispering) " + self.tx.summary(results), LANE_NOTICE)
+        return results
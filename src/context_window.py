@@ -0,0 +1,138 @@
+import re
+from collections import OrderedDict, deque
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate without a tokenizer.
+    ~4 characters per token for prose, but never fewer than ~1.3 per word,
+    which keeps short-word chatter and emoji from being undercounted.
+    """
+    if not text:
+        return 0
+    return max(len(text) // 4, len(text.split()) * 4 // 3) + 1
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trims text to roughly max_tokens, cutting on a word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max_tokens * 4]
+    space = cut.rfind(" ")
+    if space > len(cut) // 2:
+        cut = cut[:space]
+    return cut + " …[truncated]"
+
+class ContextMessage:
+    """A message as sent to the LLM: same author/content surface as discord.Message, content possibly trimmed."""
+
+    __slots__ = ("id", "author", "content")
+
+    def __init__(self, id, author, content):
+        self.id = id
+        self.author = author
+        self.content = content
+
+class RollingSummary:
+    """One line per older turn, oldest dropped first once the summary exceeds its token budget."""
+
+    __slots__ = ("lines", "tokens", "last_id")
+
+    def __init__(self):
+        self.lines = deque()  # (line, tokens)
+        self.tokens = 0
+        self.last_id = 0  # Newest message already folded in
+
+    def fold(self, message, max_line_chars: int, max_tokens: int):
+        gist = _SENTENCE_END.split(message.content.strip(), maxsplit=1)[0]
+        if len(gist) > max_line_chars:
+            gist = gist[:max_line_chars].rstrip() + "…"
+        line = f"{message.author.display_name}: {gist}"
+        tokens = estimate_tokens(line)
+        self.lines.append((line, tokens))
+        self.tokens += tokens
+        self.last_id = message.id
+        while self.tokens > max_tokens and self.lines:
+            _, dropped = self.lines.popleft()
+            self.tokens -= dropped
+
+    def render(self) -> str:
+        return "\n".join(f"- {line}" for line, _ in self.lines)
+
+class ContextWindow:
+    """
+    Picks the newest messages that fit a token budget (oversized ones trimmed)
+    and folds everything older, once, into a per-channel rolling summary.
+    Bob keeps the gist of long conversations while the prompt stays bounded.
+    """
+
+    def __init__(self, max_message_tokens: int = 300, summary_tokens: int = 400,
+                 summary_line_chars: int = 140, max_channels: int = 5000):
+        self.max_message_tokens = max_message_tokens
+        self.summary_tokens = summary_tokens
+        self.summary_line_chars = summary_line_chars
+        self.max_channels = max_channels
+        self._summaries = OrderedDict()  # channel_id -> RollingSummary, least recently used first
+
+    def _summary(self, channel_id: int) -> RollingSummary:
+        summary = self._summaries.get(channel_id)
+        if summary is None:
+            summary = RollingSummary()
+            self._summaries[channel_id] = summary
+            if len(self._summaries) > self.max_channels:
+                self._summaries.popitem(last=False)
+        else:
+            self._summaries.move_to_end(channel_id)
+        return summary
+
+    def build(self, channel_id: int, messages: list, budget_tokens: int):
+        """
+        `messages` oldest first. Returns (window, memory) where window is the list
+        of ContextMessages to send and memory the rolling summary text ("" if none).
+        """
+        window = []
+        used = 0
+        cutoff = len(messages)
+        for i in range(len(messages) - 1, -1, -1):
+            msg = messages[i]
+            content = truncate_to_tokens(msg.content, self.max_message_tokens)
+            tokens = estimate_tokens(content) + 4  # Role/name overhead
+            # The newest message always goes in, even over budget
+            if window and used + tokens > budget_tokens:
+                break
+            window.append(ContextMessage(msg.id, msg.author, content))
+            used += tokens
+            cutoff = i
+        window.reverse()
+
+        summary = self._summary(channel_id)
+        for msg in messages[:cutoff]:
+            if msg.id > summary.last_id and msg.content:
+                summary.fold(msg, self.summary_line_chars, self.summary_tokens)
+
+        return window, summary.render()
+
+    def forget(self, channel_id: int):
+        self._summaries.pop(channel_id, None)
+
+    def export(self, channel_id: int):
+        """(lines, last_id) of a channel's summary, or None. For snapshots."""
+        summary = self._summaries.get(channel_id)
+        if summary is None or not summary.lines:
+            return None
+        return [list(line) for line in summary.lines], summary.last_id
+
+    def restore(self, channel_id: int, lines: list, last_id: int):
+        """Reinstalls an exported summary unless the channel already has a newer one."""
+        summary = self._summary(channel_id)
+        if summary.last_id >= last_id:
+            return
+        summary.lines = deque((line, tokens) for line, tokens in lines)
+        summary.tokens = sum(tokens for _, tokens in lines)
+        summary.last_id = last_id
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._summaries),
+            "summary_lines": sum(len(s.lines) for s in self._summaries.values()),
+        }
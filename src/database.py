@@ -1,14 +1,53 @@
 import sqlite3
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from src.cache import TTLCache, MISSING
 
-# Ensure data directory exists
+# Nothing touches the disk at import; init_db() / RespectRepository.open() create the file
 DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
 DB_PATH = DATA_DIR / "respect.db"
 
+VALID_TIERS = (1, 2, 3)
+DEFAULT_TIER = 2  # Neutral
+
+# Statements are kept as constants so sqlite3's per-connection statement cache reuses them
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS user_respect (
+        user_id TEXT PRIMARY KEY,
+        respect_tier INTEGER DEFAULT 2
+    )
+"""
+# Users the behavior scorer moved to Tier 3; only these may be moved back automatically
+CREATE_DEMOTIONS_SQL = """
+    CREATE TABLE IF NOT EXISTS behavior_demotions (
+        user_id TEXT PRIMARY KEY
+    )
+"""
+MARK_DEMOTION_SQL = "INSERT OR IGNORE INTO behavior_demotions (user_id) VALUES (?)"
+CLEAR_DEMOTION_SQL = "DELETE FROM behavior_demotions WHERE user_id = ?"
+SELECT_TIER_SQL = "SELECT respect_tier FROM user_respect WHERE user_id = ?"
+UPSERT_TIER_SQL = """
+    INSERT INTO user_respect (user_id, respect_tier)
+    VALUES (?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET respect_tier = excluded.respect_tier
+"""
+BULK_CHUNK = 500  # Stays well under SQLite's bound-parameter limit
+
+# Tiers almost never change, so lookups are served from memory.
+# Writes go through the cache, so an update is visible immediately.
+tier_cache = TTLCache(
+    maxsize=int(os.getenv("BOB_TIER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("BOB_TIER_CACHE_TTL", "300")),
+)
+
+_initialized = set()  # DB paths whose schema has been created by this process
+
 def get_connection():
-    """Establishes a connection to the SQLite database."""
+    """Establishes a connection to the SQLite database, initializing it on first use."""
+    if DB_PATH not in _initialized:
+        init_db()
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
@@ -17,50 +56,198 @@ def init_db():
     """
     Initializes the database table for storing user respect tiers.
     Schema: user_id (TEXT PRIMARY KEY), respect_tier (INTEGER)
+    Idempotent; called once at startup, not on import.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_respect (
-            user_id TEXT PRIMARY KEY,
-            respect_tier INTEGER DEFAULT 2
-        )
-    """)
+    Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(CREATE_TABLE_SQL)
+    conn.execute(CREATE_DEMOTIONS_SQL)
     conn.commit()
     conn.close()
+    _initialized.add(DB_PATH)
 
 def get_user_tier(user_id: str) -> int:
     """
     Retrieves the respect tier for a given user_id.
     Returns 2 (Neutral) if the user is not found.
     """
+    cached = tier_cache.get(str(user_id), MISSING)
+    if cached is not MISSING:
+        return cached
+
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT respect_tier FROM user_respect WHERE user_id = ?", (str(user_id),))
+    cursor.execute(SELECT_TIER_SQL, (str(user_id),))
     row = cursor.fetchone()
     conn.close()
     
-    if row:
-        return row["respect_tier"]
-    return 2  # Default to Tier 2 (Neutral)
+    tier = row["respect_tier"] if row else DEFAULT_TIER
+    tier_cache.set(str(user_id), tier)
+    return tier
 
 def update_user_tier(user_id: str, tier: int):
     """
     Updates or inserts the respect tier for a user.
     Tier should be 1, 2, or 3.
     """
-    if tier not in [1, 2, 3]:
-        raise ValueError("Respect tier must be 1, 2, or 3.")
+    _validate_tier(tier)
     
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO user_respect (user_id, respect_tier)
-        VALUES (?, ?)
-        ON CONFLICT(user_id) DO UPDATE SET respect_tier = excluded.respect_tier
-    """, (str(user_id), tier))
+    cursor.execute(UPSERT_TIER_SQL, (str(user_id), tier))
+    cursor.execute(CLEAR_DEMOTION_SQL, (str(user_id),))  # Set by hand: the behavior scorer no longer owns it
     conn.commit()
     conn.close()
+    tier_cache.invalidate(str(user_id))
+
+def _validate_tier(tier: int):
+    if tier not in VALID_TIERS:
+        raise ValueError("Respect tier must be 1, 2, or 3.")
+
+class RespectRepository:
+    """
+    Async access to respect tiers over one long-lived WAL-mode connection.
+    All SQLite work runs on a single dedicated thread, so the event loop never
+    blocks on disk I/O and the connection is never shared between threads.
+    """
+
+    def __init__(self, db_path=None, cache: TTLCache = None):
+        self.db_path = db_path or DB_PATH
+        self.cache = tier_cache if cache is None else cache
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="respect-db")
+        self._conn = None
+        self._closed = False
+
+    # --- Worker-thread side ---
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=64)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(CREATE_TABLE_SQL)
+            conn.execute(CREATE_DEMOTIONS_SQL)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _get_tiers_sync(self, user_ids: list) -> dict:
+        conn = self._connection()
+        tiers = {}
+        for start in range(0, len(user_ids), BULK_CHUNK):
+            chunk = user_ids[start:start + BULK_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT user_id, respect_tier FROM user_respect WHERE user_id IN ({placeholders})", chunk
+            ).fetchall()
+            tiers.update((row["user_id"], row["respect_tier"]) for row in rows)
+        return {user_id: tiers.get(user_id, DEFAULT_TIER) for user_id in user_ids}
+
+    def _get_tier_sync(self, user_id: str) -> int:
+        row = self._connection().execute(SELECT_TIER_SQL, (user_id,)).fetchone()
+        return row["respect_tier"] if row else DEFAULT_TIER
+
+    def _set_tiers_sync(self, rows: list, marks: list = (), unmarks: list = ()):
+        conn = self._connection()
+        with conn:  # One transaction for the whole batch
+            conn.executemany(UPSERT_TIER_SQL, rows)
+            conn.executemany(MARK_DEMOTION_SQL, marks)
+            conn.executemany(CLEAR_DEMOTION_SQL, unmarks)
+
+    def _get_demotions_sync(self, user_ids) -> set:
+        conn = self._connection()
+        if user_ids is None:
+            return {row["user_id"] for row in conn.execute("SELECT user_id FROM behavior_demotions")}
+        demoted = set()
+        for start in range(0, len(user_ids), BULK_CHUNK):
+            chunk = user_ids[start:start + BULK_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(f"SELECT user_id FROM behavior_demotions WHERE user_id IN ({placeholders})", chunk)
+            demoted.update(row["user_id"] for row in rows)
+        return demoted
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- Event-loop side ---
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def open(self):
+        """Opens the connection and ensures the schema exists. Optional; the first query does the same."""
+        await self._run(self._connection)
+
+    async def get_tier(self, user_id: str) -> int:
+        """Respect tier for one user, 2 (Neutral) if unknown."""
+        user_id = str(user_id)
+        tier = self.cache.get(user_id, MISSING)
+        if tier is MISSING:
+            tier = await self._run(self._get_tier_sync, user_id)
+            self.cache.set(user_id, tier)
+        return tier
+
+    async def get_tiers(self, user_ids) -> dict:
+        """Respect tiers for many users at once, keyed by user_id string."""
+        tiers = {}
+        missing = []
+        for user_id in dict.fromkeys(str(u) for u in user_ids):
+            tier = self.cache.get(user_id, MISSING)
+            if tier is MISSING:
+                missing.append(user_id)
+            else:
+                tiers[user_id] = tier
+
+        if missing:
+            fetched = await self._run(self._get_tiers_sync, missing)
+            for user_id, tier in fetched.items():
+                self.cache.set(user_id, tier)
+            tiers.update(fetched)
+        return tiers
+
+    async def set_tier(self, user_id: str, tier: int):
+        await self.set_tiers({user_id: tier})
+
+    async def set_tiers(self, tiers: dict):
+        """Upserts many users' tiers in a single transaction. Tiers set here count as set by hand."""
+        await self._write_tiers(tiers, by_behavior=False)
+
+    async def apply_behavior(self, tiers: dict):
+        """
+        Tier changes decided by the behavior scorer, in one transaction: Tier 3
+        marks the user as demoted by the scorer, anything else clears the mark.
+        """
+        await self._write_tiers(tiers, by_behavior=True)
+
+    async def get_behavior_demotions(self, user_ids=None) -> set:
+        """Users (as id strings) the behavior scorer demoted and may restore; all of them if user_ids is None."""
+        if user_ids is not None:
+            user_ids = list(dict.fromkeys(str(u) for u in user_ids))
+        return await self._run(self._get_demotions_sync, user_ids)
+
+    async def _write_tiers(self, tiers: dict, by_behavior: bool):
+        for tier in tiers.values():
+            _validate_tier(tier)
+        rows = [(str(user_id), tier) for user_id, tier in tiers.items()]
+        if not rows:
+            return
+        marks = [(user_id,) for user_id, tier in rows if by_behavior and tier == 3]
+        unmarks = [(user_id,) for user_id, tier in rows if not by_behavior or tier != 3]
+        for user_id, _ in rows:
+            self.cache.invalidate(user_id)
+        await self._run(self._set_tiers_sync, rows, marks, unmarks)
+        for user_id, tier in rows:
+            self.cache.set(user_id, tier)  # Write-through
 
-# Initialize DB on import (or you can call it explicitly in main)
-init_db()
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=False)
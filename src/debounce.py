@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger("Debounce")
+
+class _Burst:
+    __slots__ = ("channel", "first_at", "last_at", "deadline", "handle", "messages")
+
+    def __init__(self, channel, now: float):
+        self.channel = channel
+        self.first_at = now
+        self.last_at = now
+        self.deadline = now
+        self.handle = None
+        self.messages = 0
+
+class AdaptiveDebouncer:
+    """
+    Coalesces a channel's messages into one burst and dispatches it once the
+    channel goes quiet.
+
+    Each pending burst has at most one loop timer. A new message only moves
+    the burst's deadline; when the timer fires early it re-arms itself for
+    the new deadline, so busy channels don't churn tasks. The quiet window
+    follows the channel's typical gap between messages within a burst (an
+    EWMA), typing events push the deadline out, and `max_wait` caps how long
+    a burst can be held open. Urgent messages (mentions, the Boss) dispatch
+    immediately.
+    """
+
+    def __init__(self, dispatch, min_window: float = 0.5, max_window: float = 3.0, max_wait: float = 8.0,
+                 typing_grace: float = 2.5, default_gap: float = 0.6, factor: float = 1.5, alpha: float = 0.3,
+                 legacy_delay: float = 2.0, max_channels: int = 5000):
+        self._dispatch = dispatch
+        self.min_window = min_window
+        self.max_window = max_window
+        self.max_wait = max_wait
+        self.typing_grace = typing_grace
+        self.default_gap = default_gap
+        self.factor = factor
+        self.alpha = alpha
+        self.legacy_delay = legacy_delay  # The old fixed sleep; baseline for latency_saved
+        self.max_channels = max_channels
+
+        self._bursts = {}  # channel_id -> _Burst
+        self._gaps = OrderedDict()  # channel_id -> EWMA of in-burst gaps (s), least recently used first
+
+        self.messages = 0
+        self.dispatches = 0
+        self.urgent = 0
+        self.capped = 0
+        self.timers = 0
+        self.typing_extensions = 0
+        self.latency_saved = 0.0
+
+    def window(self, channel_id) -> float:
+        gap = self._gaps.get(channel_id, self.default_gap)
+        return min(self.max_window, max(self.min_window, gap * self.factor))
+
+    def _record_gap(self, channel_id, gap: float):
+        if gap >= self.max_window:
+            return  # A pause that long already ended a burst; it says nothing about in-burst pacing
+        previous = self._gaps.pop(channel_id, None)
+        self._gaps[channel_id] = gap if previous is None else previous + self.alpha * (gap - previous)
+        if len(self._gaps) > self.max_channels:
+            self._gaps.popitem(last=False)
+
+    def touch(self, channel, urgent: bool = False):
+        """Adds a message to the channel's pending burst."""
+        now = asyncio.get_running_loop().time()
+        self.messages += 1
+        burst = self._bursts.get(channel.id)
+        if burst is None:
+            burst = self._bursts[channel.id] = _Burst(channel, now)
+        else:
+            self._record_gap(channel.id, now - burst.last_at)
+            burst.channel = channel
+        burst.last_at = now
+        burst.messages += 1
+
+        if urgent:
+            self.urgent += 1
+            self._fire(channel.id)
+        else:
+            self._extend(burst, now + self.window(channel.id))
+
+    def typing(self, channel_id):
+        """Someone started typing: hold a pending burst open a little longer."""
+        burst = self._bursts.get(channel_id)
+        if burst is not None:
+            self.typing_extensions += 1
+            self._extend(burst, asyncio.get_running_loop().time() + self.typing_grace)
+
+    def cancel(self, channel_id):
+        burst = self._bursts.pop(channel_id, None)
+        if burst is not None and burst.handle is not None:
+            burst.handle.cancel()
+        self._gaps.pop(channel_id, None)
+
+    def pending(self, channel_id) -> bool:
+        return channel_id in self._bursts
+
+    def pending_channels(self) -> list:
+        return list(self._bursts)
+
+    def _extend(self, burst: _Burst, deadline: float):
+        burst.deadline = max(burst.deadline, min(deadline, burst.first_at + self.max_wait))
+        if burst.handle is None:
+            burst.handle = asyncio.get_running_loop().call_at(burst.deadline, self._on_timer, burst.channel.id)
+            self.timers += 1
+
+    def _on_timer(self, channel_id):
+        burst = self._bursts.get(channel_id)
+        if burst is None:
+            return
+        burst.handle = None
+        loop = asyncio.get_running_loop()
+        if loop.time() < burst.deadline:
+            # Deadline moved while we slept: re-arm once instead of once per message
+            burst.handle = loop.call_at(burst.deadline, self._on_timer, channel_id)
+            self.timers += 1
+            return
+        if burst.deadline >= burst.first_at + self.max_wait:
+            self.capped += 1
+        self._fire(channel_id)
+
+    def _fire(self, channel_id):
+        burst = self._bursts.pop(channel_id)
+        if burst.handle is not None:
+            burst.handle.cancel()
+        self.dispatches += 1
+        self.latency_saved += self.legacy_delay - (asyncio.get_running_loop().time() - burst.last_at)
+        try:
+            self._dispatch(burst.channel)
+        except Exception as e:
+            logger.error(f"Dispatch failed for channel {channel_id}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._bursts),
+            "messages": self.messages,
+            "dispatches": self.dispatches,
+            # Messages folded into an earlier burst instead of getting their own generation
+            "calls_avoided": self.messages - self.dispatches - len(self._bursts),
+            "urgent": self.urgent,
+            "capped": self.capped,
+            "timers": self.timers,
+            "typing_extensions": self.typing_extensions,
+            "latency_saved_s": self.latency_saved,
+            "mean_latency_saved_ms": self.latency_saved / self.dispatches * 1000 if self.dispatches else 0.0,
+        }
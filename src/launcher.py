@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+
+import aiohttp
+import discord
+
+logger = logging.getLogger("Launcher")
+
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+IDENTIFY_INTERVAL = 5.0  # Discord allows one IDENTIFY per 5s per max_concurrency bucket
+RESTART_BACKOFF_MAX = 60.0
+HEALTHY_AFTER = 60.0  # A worker that stayed up this long restarts without backoff
+
+def make_bot(shard_ids=None, shard_count=None, sharded=False):
+    """BobBot for a single connection, or ShardedBobBot owning `shard_ids` of `shard_count`."""
+    from src.bot import BobBot  # Imported late so worker processes can set BOB_* env first
+
+    if not sharded and shard_ids is None:
+        return BobBot()
+
+    class ShardedBobBot(BobBot, discord.AutoShardedClient):
+        """BobBot on discord.py's AutoShardedClient: many shards, one event loop."""
+
+    return ShardedBobBot(shard_ids=shard_ids, shard_count=shard_count)
+
+async def run_bot(token: str, **options):
+    bot = make_bot(**options)
+    closing = None
+
+    def terminate():
+        nonlocal closing
+        if closing is None:
+            logger.info("SIGTERM received, shutting down")
+            closing = asyncio.create_task(bot.close())
+
+    # Deploys and the Supervisor stop Bob with SIGTERM; close() writes the snapshot and flushes pending state first
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, terminate)
+    except NotImplementedError:
+        pass  # Windows: no loop signal handlers
+    try:
+        async with bot:
+            await bot.start(token)
+    finally:
+        if closing is not None:
+            await closing  # discord.py's __aexit__ only waits for its own part of close()
+
+async def fetch_recommended_shards(token: str) -> int:
+    """Shard count Discord recommends for this bot's guild count."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_BOT_URL, headers={"Authorization": f"Bot {token}"}) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+    return int(data["shards"])
+
+def shard_ranges(shard_count: int, workers: int) -> list:
+    """Splits shards 0..shard_count-1 into `workers` contiguous, near-equal ranges."""
+    workers = max(1, min(workers, shard_count))
+    base, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for i in range(workers):
+        size = base + (1 if i < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+def _worker_main(token: str, shard_ids: list, shard_count: int, index: int):
+    """Entry point of one worker process."""
+    # Workers share the respect DB and reply store; keep each process's view of tiers fresh
+    os.environ["BOB_SHARED_RESPONSES"] = "1"
+    os.environ.setdefault("BOB_TIER_CACHE_TTL", "30")
+    os.environ.setdefault("BOB_SNAPSHOT_PATH", f"data/snapshot-w{index}.bin")  # One per worker; each restores its own shards
+    metrics_port = int(os.getenv("BOB_METRICS_PORT", "0"))
+    if metrics_port:
+        os.environ["BOB_METRICS_PORT"] = str(metrics_port + index)
+
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [w{index}] %(name)s %(levelname)s: %(message)s")
+    logger.info(f"Worker {index} starting shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count}")
+    try:
+        asyncio.run(run_bot(token, shard_ids=shard_ids, shard_count=shard_count))
+    except discord.LoginFailure as e:
+        logger.error(f"Worker {index} cannot log in ({e}); not restarting it.")  # Clean exit: a restart won't help
+    except KeyboardInterrupt:
+        pass
+
+class _Worker:
+    __slots__ = ("index", "shard_ids", "process", "started_at", "backoff", "restart_at")
+
+    def __init__(self, index: int, shard_ids: list):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.process = None
+        self.started_at = 0.0
+        self.backoff = 1.0
+        self.restart_at = None
+
+class Supervisor:
+    """
+    Runs Bob as several processes, each an AutoShardedClient over one
+    contiguous shard range, and restarts workers that crash (exponential
+    backoff, reset once a worker has stayed up for a minute). A worker
+    that exits cleanly is not restarted.
+    """
+
+    def __init__(self, token: str, shard_count: int, workers: int, poll_interval: float = 1.0):
+        self.token = token
+        self.shard_count = shard_count
+        self.workers = [_Worker(i, ids) for i, ids in enumerate(shard_ranges(shard_count, workers))]
+        self.poll_interval = poll_interval
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stopping = False
+        self.restarts = 0
+
+    def _start(self, worker: _Worker):
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.token, worker.shard_ids, self.shard_count, worker.index),
+            name=f"bob-worker-{worker.index}",
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+
+    def _check(self, worker: _Worker, now: float):
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                logger.info(f"Restarting worker {worker.index} (shards {worker.shard_ids[0]}-{worker.shard_ids[-1]})")
+                self.restarts += 1
+                self._start(worker)
+            return
+        if worker.process is None or worker.process.is_alive():
+            return
+
+        code = worker.process.exitcode
+        if code == 0:
+            logger.info(f"Worker {worker.index} exited cleanly.")
+            worker.process = None
+            return
+        if now - worker.started_at >= HEALTHY_AFTER:
+            worker.backoff = 1.0
+        logger.error(f"Worker {worker.index} died (exit code {code}); restarting in {worker.backoff:.0f}s")
+        worker.restart_at = now + worker.backoff
+        worker.backoff = min(worker.backoff * 2, RESTART_BACKOFF_MAX)
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(f"Supervising {len(self.workers)} workers over {self.shard_count} shards")
+
+        # Stagger first logins so the workers' IDENTIFYs don't collide on the rate limit
+        for worker in self.workers:
+            if self._stopping:
+                break
+            self._start(worker)
+            time.sleep(IDENTIFY_INTERVAL * len(worker.shard_ids))
+
+        while not self._stopping and any(w.process is not None or w.restart_at is not None for w in self.workers):
+            now = time.monotonic()
+            for worker in self.workers:
+                self._check(worker, now)
+            time.sleep(self.poll_interval)
+
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout=10)
+                if worker.process.is_alive():
+                    worker.process.kill()
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self.workers),
+            "alive": sum(1 for w in self.workers if w.process is not None and w.process.is_alive()),
+            "restarts": self.restarts,
+        }
+
+def launch(token: str):
+    """
+    Starts Bob in the mode picked by BOB_SHARD_MODE:
+    single (one connection), auto (AutoShardedClient, one process) or
+    process (a Supervisor with BOB_WORKERS processes, default one per core).
+    BOB_SHARD_COUNT overrides Discord's recommended shard count.
+    """
+    mode = os.getenv("BOB_SHARD_MODE", "single")
+    shard_count = int(os.getenv("BOB_SHARD_COUNT", "0")) or None
+    # Spawned workers configure their own logging in _worker_main
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+
+    if mode == "single":
+        asyncio.run(run_bot(token))
+    elif mode == "auto":
+        asyncio.run(run_bot(token, shard_count=shard_count, sharded=True))
+    elif mode == "process":
+        if shard_count is None:
+            shard_count = asyncio.run(fetch_recommended_shards(token))
+        workers = int(os.getenv("BOB_WORKERS", "0")) or os.cpu_count() or 1
+        Supervisor(token, shard_count, workers).run()
+    else:
+        raise ValueError(f"Unknown BOB_SHARD_MODE '{mode}' (expected single, auto or process)")
@@ -0,0 +1,133 @@
+import logging
+from collections import OrderedDict, deque
+
+logger = logging.getLogger("MessageCache")
+
+class MessageCache:
+    """
+    Bounded, per-channel ring buffers of recent messages.
+    Fed from gateway events so replies don't need a channel.history() round-trip.
+    Idle channels are evicted LRU once either the channel cap or the global message cap is hit.
+    """
+
+    def __init__(self, per_channel: int = 50, max_channels: int = 5000, max_messages: int = 100_000):
+        self.per_channel = per_channel
+        self.max_channels = max_channels
+        self.max_messages = max_messages
+
+        self._channels = OrderedDict()  # channel_id -> deque[Message], oldest channel first
+        self._warm = set()  # channels whose buffer is known to be a complete recent window
+        self._total = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return self._total
+
+    def _buffer(self, channel_id: int) -> deque:
+        """Returns the buffer for a channel (creating it) and marks it most recently used."""
+        buf = self._channels.get(channel_id)
+        if buf is None:
+            buf = deque(maxlen=self.per_channel)
+            self._channels[channel_id] = buf
+        else:
+            self._channels.move_to_end(channel_id)
+        return buf
+
+    def _enforce_caps(self):
+        while self._channels and (len(self._channels) > self.max_channels or self._total > self.max_messages):
+            channel_id, buf = self._channels.popitem(last=False)
+            self._total -= len(buf)
+            self._warm.discard(channel_id)
+            self.evictions += 1
+
+    def add(self, message):
+        """Appends a newly created message to its channel buffer."""
+        buf = self._buffer(message.channel.id)
+        if len(buf) < buf.maxlen:
+            self._total += 1
+        buf.append(message)
+        self._enforce_caps()
+
+    def update(self, message):
+        """Replaces a cached message after an edit. Unknown messages are ignored."""
+        buf = self._channels.get(message.channel.id)
+        if not buf:
+            return
+        for i, cached in enumerate(buf):
+            if cached.id == message.id:
+                buf[i] = message
+                return
+
+    def remove(self, channel_id: int, message_ids):
+        """Drops deleted messages from a channel buffer."""
+        buf = self._channels.get(channel_id)
+        if not buf:
+            return
+        message_ids = set(message_ids)
+        kept = [m for m in buf if m.id not in message_ids]
+        self._total -= len(buf) - len(kept)
+        buf.clear()
+        buf.extend(kept)
+
+    def remove_channel(self, channel_id: int):
+        buf = self._channels.pop(channel_id, None)
+        if buf is not None:
+            self._total -= len(buf)
+        self._warm.discard(channel_id)
+
+    def warm_channels(self) -> list:
+        """(channel_id, messages oldest first) for every warm channel, least recently used first."""
+        return [(channel_id, list(buf)) for channel_id, buf in self._channels.items() if channel_id in self._warm]
+
+    def is_warm(self, channel_id: int) -> bool:
+        return channel_id in self._warm
+
+    def get(self, channel_id: int, limit: int):
+        """
+        Returns up to `limit` recent messages, oldest first.
+        Returns None if the channel is cold and needs a history fetch to prime it.
+        """
+        if channel_id not in self._warm:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        buf = self._buffer(channel_id)
+        if limit >= len(buf):
+            return list(buf)
+        return list(buf)[-limit:]
+
+    def latest(self, channel_id: int):
+        """Newest cached message in a channel, or None. Does not count as a lookup."""
+        buf = self._channels.get(channel_id)
+        return buf[-1] if buf else None
+
+    def prime(self, channel_id: int, messages):
+        """
+        Seeds a cold channel from a history fetch (any order).
+        Messages that arrived through the gateway in the meantime are merged, not duplicated.
+        """
+        buf = self._buffer(channel_id)
+        merged = {m.id: m for m in messages}
+        for m in buf:
+            merged[m.id] = m  # Gateway copy is the freshest
+
+        self._total -= len(buf)
+        buf.clear()
+        buf.extend(merged[i] for i in sorted(merged))
+        self._total += len(buf)
+        self._warm.add(channel_id)
+        self._enforce_caps()
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._channels),
+            "warm_channels": len(self._warm),
+            "messages": self._total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
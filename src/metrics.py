@@ -0,0 +1,173 @@
+import bisect
+import logging
+import re
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("Metrics")
+
+_INVALID_NAME = re.compile(r'[^a-zA-Z0-9_]')
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds), cheap enough to update on every call."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf if it falls past the last bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, n in zip(self.BUCKETS + (float("inf"),), self.counts):
+            running += n
+            if running >= target:
+                return bound
+        return float("inf")
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _flatten(prefix: str, value, out: list):
+    """Numeric leaves of a nested stats() dict as (metric_name, value); strings and None are skipped."""
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            _flatten(f"{prefix}_{_INVALID_NAME.sub('_', str(key))}", inner, out)
+    elif isinstance(value, (bool, int, float)):
+        out.append((prefix, float(value)))
+
+class Metrics:
+    """
+    In-process counters and stage histograms for the reply hot path, plus
+    gauges read from each component's stats() at scrape time. Rendered in
+    the Prometheus text format on a local HTTP endpoint.
+    """
+
+    def __init__(self, prefix: str = "bob"):
+        self.prefix = prefix
+        self._counters = {}  # name -> {label key -> value}
+        self._histograms = {}  # name -> {label key -> Histogram}
+        self._collectors = {}  # name -> callable returning a stats() dict
+        self._runner = None
+
+    def inc(self, name: str, amount: int = 1, **labels):
+        series = self._counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        series = self._histograms.setdefault(name, {})
+        key = _labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Times the enclosed block (awaits included) into histogram `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register(self, name: str, collector):
+        """Exports collector()'s numeric fields as gauges named <prefix>_<name>_<field>."""
+        self._collectors[name] = collector
+
+    def counter(self, name: str, **labels) -> int:
+        return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def render(self) -> str:
+        lines = []
+        for name, series in self._counters.items():
+            metric = f"{self.prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f"{metric}{_format_labels(key)} {value}" for key, value in series.items())
+
+        for name, series in self._histograms.items():
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for key, histogram in series.items():
+                running = 0
+                for bound, n in zip(histogram.BUCKETS + ("+Inf",), histogram.counts):
+                    running += n
+                    le = f'le="{bound}"'
+                    lines.append(f"{metric}_bucket{_format_labels(key, le)} {running}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {histogram.sum}")
+                lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+
+        for name, collector in self._collectors.items():
+            gauges = []
+            try:
+                _flatten(f"{self.prefix}_{name}", collector(), gauges)
+            except Exception as e:
+                logger.error("Metrics collector %s failed: %s", name, e)
+                continue
+            for metric, value in gauges:
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    # --- HTTP endpoint ---
+
+    async def _handle(self, request):
+        from aiohttp import web
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+    async def start_server(self, host: str = "127.0.0.1", port: int = 9108):
+        from aiohttp import web  # Only deployments that export metrics pay for aiohttp.web
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info("Metrics endpoint listening on http://%s:%d/metrics", host, port)
+
+    async def stop_server(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+class LogSampler:
+    """
+    Caps a hot log line to one record per interval per message template;
+    the next record that gets through reports how many were skipped.
+    Arguments are only formatted for records that are actually emitted.
+    """
+
+    def __init__(self, interval: float = 5.0, clock=time.monotonic):
+        self.interval = interval
+        self._clock = clock
+        self._last = {}  # template -> (emitted_at, suppressed)
+
+    def log(self, log: logging.Logger, level: int, msg: str, *args):
+        if not log.isEnabledFor(level):
+            return
+        now = self._clock()
+        emitted_at, suppressed = self._last.get(msg, (None, 0))
+        if emitted_at is not None and now - emitted_at < self.interval:
+            self._last[msg] = (emitted_at, suppressed + 1)
+            return
+        self._last[msg] = (now, 0)
+        if suppressed:
+            log.log(level, msg + " (+%d similar suppressed)", *args, suppressed)
+        else:
+            log.log(level, msg, *args)
@@ -0,0 +1,150 @@
+import heapq
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger("NameIndex")
+
+FUZZY_CUTOFF = 0.5  # Same tolerance the linear difflib scan used
+FUZZY_CANDIDATES = 32  # Names scored with difflib after trigram pre-selection
+
+def _trigrams(name: str) -> set:
+    padded = f"  {name.casefold()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _sort_key(obj):
+    return (getattr(obj, "position", 0), obj.id)
+
+class NameTable:
+    """
+    Exact, casefolded and trigram lookups over one set of named objects.
+    Duplicate names resolve to the first object by position, like
+    discord.utils.get over guild.text_channels.
+    """
+
+    def __init__(self, objects=()):
+        self._exact = defaultdict(list)
+        self._folded = defaultdict(list)
+        self._grams = defaultdict(set)  # trigram -> names containing it
+        # Bulk build: appending in position order keeps every bucket sorted without re-sorting
+        for obj in sorted(objects, key=_sort_key):
+            self._insert(obj)
+
+    def _insert(self, obj):
+        name = obj.name
+        if not self._exact[name]:
+            for gram in _trigrams(name):
+                self._grams[gram].add(name)
+        self._exact[name].append(obj)
+        self._folded[name.casefold()].append(obj)
+
+    def __len__(self):
+        return len(self._exact)
+
+    def add(self, obj):
+        self._insert(obj)
+        self._exact[obj.name].sort(key=_sort_key)
+        self._folded[obj.name.casefold()].sort(key=_sort_key)
+
+    def remove(self, obj, name: str = None):
+        """Removes obj, indexed under `name` (defaults to its current name)."""
+        name = obj.name if name is None else name
+        for table, key in ((self._exact, name), (self._folded, name.casefold())):
+            bucket = table.get(key)
+            if not bucket:
+                continue
+            bucket[:] = [o for o in bucket if o.id != obj.id]
+            if not bucket:
+                del table[key]
+        if name not in self._exact:
+            for gram in _trigrams(name):
+                names = self._grams.get(gram)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del self._grams[gram]
+
+    def _fuzzy_candidates(self, name: str) -> list:
+        shared = defaultdict(int)
+        for gram in _trigrams(name):
+            for candidate in self._grams.get(gram, ()):
+                shared[candidate] += 1
+        if not shared:
+            return list(self._exact)  # Nothing in common at all: let difflib judge everything
+        return heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.__getitem__)
+
+    def lookup(self, name: str):
+        """Returns (obj, fuzzy). Exact name, then case-insensitive, then closest fuzzy match."""
+        bucket = self._exact.get(name) or self._folded.get(name.casefold())
+        if bucket:
+            return bucket[0], False
+
+        import difflib  # Only needed once an exact lookup misses
+        matches = difflib.get_close_matches(name, self._fuzzy_candidates(name), n=1, cutoff=FUZZY_CUTOFF)
+        if matches:
+            return self._exact[matches[0]][0], True
+        return None, False
+
+class NameIndex:
+    """
+    Guild and text-channel name lookups for the [[TX]] tool, kept current
+    from gateway events instead of scanning every guild on each call.
+    Channel tables are built per guild on first use.
+    """
+
+    def __init__(self):
+        self._guilds = NameTable()
+        self._channels = {}  # guild_id -> NameTable of text channels
+
+    def rebuild(self, guilds):
+        self._guilds = NameTable(guilds)
+        self._channels.clear()
+
+    # --- Gateway events ---
+
+    def add_guild(self, guild):
+        self._guilds.add(guild)
+
+    def remove_guild(self, guild):
+        self._guilds.remove(guild)
+        self._channels.pop(guild.id, None)
+
+    def update_guild(self, before, after):
+        if before.name != after.name:
+            self._guilds.remove(before, before.name)
+            self._guilds.add(after)
+
+    def add_channel(self, channel):
+        table = self._channels.get(channel.guild.id)
+        if table is not None:
+            table.add(channel)
+
+    def remove_channel(self, channel):
+        table = self._channels.get(channel.guild.id)
+        if table is not None:
+            table.remove(channel)
+
+    def update_channel(self, before, after):
+        table = self._channels.get(after.guild.id)
+        if table is not None and (before.name != after.name or before.position != after.position):
+            table.remove(before, before.name)
+            table.add(after)
+
+    # --- Lookups ---
+
+    def resolve_guild(self, name: str):
+        """Returns (guild, fuzzy)."""
+        return self._guilds.lookup(name)
+
+    def resolve_channel(self, guild, name: str):
+        """Returns (text_channel, fuzzy) within guild."""
+        table = self._channels.get(guild.id)
+        if table is None:
+            table = NameTable(guild.text_channels)
+            self._channels[guild.id] = table
+        return table.lookup(name)
+
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self._guilds),
+            "channel_tables": len(self._channels),
+        }
@@ -0,0 +1,312 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger("Outbound")
+
+DISCORD_LIMIT = 2000
+
+# Lower goes first
+LANE_BOSS = 0  # Boss commands and replies to Tier 1
+LANE_REPLY = 1  # Ordinary replies
+LANE_NOTICE = 2  # Tool notices, confirmations, fan-out sends
+
+# Discord's per-channel buckets: (burst, tokens per second)
+ROUTES = {
+    "send": (5, 1.0),  # POST /channels/{id}/messages: 5 per 5s
+    "react": (1, 4.0),  # PUT .../reactions/{emoji}/@me: 1 per 0.25s
+}
+GLOBAL_RATE = 50.0  # Requests per second across every route
+
+class OutboundRejected(Exception):
+    """Raised to a caller whose message was shed from a full channel queue."""
+
+def split_message(text: str, limit: int = DISCORD_LIMIT) -> list:
+    """Splits text into chunks of at most `limit` chars, preferring line breaks, then spaces."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut < limit // 2:
+            cut = text.rfind(" ", 0, limit + 1)
+        if cut < limit // 2:
+            cut = limit
+        chunks.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+class TokenBucket:
+    """Refilling token bucket; `penalize` empties it for a server-supplied retry_after."""
+
+    def __init__(self, capacity: float, per_second: float, clock=time.monotonic):
+        self.capacity = capacity
+        self.per_second = per_second
+        self._clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        now = self._clock()
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.per_second)
+        return wait
+
+    def take(self):
+        self._refill(self._clock())
+        self.tokens -= 1
+
+    def penalize(self, retry_after: float):
+        self.tokens = 0
+        self.blocked_until = max(self.blocked_until, self._clock() + retry_after)
+
+class _Item:
+    __slots__ = ("lane", "seq", "kind", "target", "content", "futures", "merge", "attempts")
+
+    def __init__(self, lane, seq, kind, target, content, future, merge):
+        self.lane = lane
+        self.seq = seq
+        self.kind = kind
+        self.target = target  # Channel for "send", message for "react"
+        self.content = content  # Text, or the emoji
+        self.futures = [future]
+        self.merge = merge
+        self.attempts = 0
+
+    def __lt__(self, other):
+        return (self.lane, self.seq) < (other.lane, other.seq)
+
+    @property
+    def live(self) -> bool:
+        return any(not f.done() for f in self.futures)
+
+class _Route:
+    __slots__ = ("bucket", "heap", "worker")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.heap = []
+        self.worker = None
+
+class OutboundDispatcher:
+    """
+    Every message and reaction Bob sends goes through here.
+    Each (kind, channel) route has its own token bucket sized like Discord's,
+    plus one global bucket, so sends wait locally instead of collecting 429s.
+    While a channel is backlogged its queue is ordered by lane, and adjacent
+    short messages are merged into one send; text over 2000 characters is
+    split. A 429 that still gets through empties the bucket for the
+    server's retry_after and the send is retried, at most `max_attempts` times.
+    """
+
+    def __init__(self, max_pending: int = 50, max_attempts: int = 3, merge_separator: str = "\n"):
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.merge_separator = merge_separator
+        self._routes = {}  # (kind, channel_id) -> _Route, only while it has work
+        self._buckets = {}  # (kind, channel_id) -> TokenBucket; kept so a route's budget survives idling
+        self._global = TokenBucket(GLOBAL_RATE, GLOBAL_RATE)
+        self._seq = itertools.count()
+        self._closed = False
+
+        self.queued = 0
+        self.calls = 0
+        self.merged = 0
+        self.splits = 0
+        self.shed = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.errors = 0
+        self.throttled = 0.0  # Seconds routes spent waiting for tokens
+        self.lanes = {}  # lane -> items delivered
+
+    def _bucket(self, key) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) > 10000:
+                # Idle buckets refill to full anyway; dropping them only forgets a pending penalty
+                self._buckets = {k: b for k, b in self._buckets.items() if k in self._routes}
+            bucket = self._buckets[key] = TokenBucket(*ROUTES[key[0]])
+        return bucket
+
+    def _enqueue(self, kind: str, channel_id, target, content, lane: int, merge: bool) -> asyncio.Future:
+        if self._closed:
+            raise RuntimeError("Outbound dispatcher is closed")
+        key = (kind, channel_id)
+        route = self._routes.get(key)
+        if route is None:
+            route = self._routes[key] = _Route(self._bucket(key))
+
+        future = asyncio.get_running_loop().create_future()
+        item = _Item(lane, next(self._seq), kind, target, content, future, merge)
+        if len(route.heap) >= self.max_pending:
+            worst = max(route.heap)
+            if item > worst:
+                self.shed += 1
+                raise OutboundRejected("channel queue full")
+            route.heap.remove(worst)
+            heapq.heapify(route.heap)
+            self.shed += 1
+            for f in worst.futures:
+                if not f.done():
+                    f.set_exception(OutboundRejected("shed for a higher-priority send"))
+
+        heapq.heappush(route.heap, item)
+        self.queued += 1
+        if route.worker is None:
+            route.worker = asyncio.create_task(self._drain(key, route))
+        return future
+
+    async def _wait(self, future: asyncio.Future):
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.cancel()  # The worker skips it (or drops it from a merged send's waiters)
+            raise
+
+    async def send(self, channel, content: str, lane: int = LANE_REPLY, merge: bool = True):
+        """
+        Queues `content` for `channel` and returns the last discord.Message it went out in.
+        Merged messages share one discord.Message.
+        """
+        chunks = split_message(content)
+        if len(chunks) > 1:
+            self.splits += 1
+            merge = False  # Chunks are already near the limit
+        futures = []
+        message = None
+        try:
+            for chunk in chunks:
+                futures.append(self._enqueue("send", channel.id, channel, chunk, lane, merge))
+            for future in futures:
+                message = await self._wait(future)
+        except BaseException:
+            for future in futures:
+                future.cancel()  # A rejected, failed or cancelled chunk takes the rest of the reply with it
+            raise
+        return message
+
+    async def react(self, message, emoji, lane: int = LANE_NOTICE):
+        await self._wait(self._enqueue("react", message.channel.id, message, emoji, lane, False))
+
+    def _next_batch(self, route: _Route):
+        """Highest-priority live item, with any mergeable sends queued right behind it folded in."""
+        while route.heap:
+            item = heapq.heappop(route.heap)
+            if item.live:
+                break
+        else:
+            return None
+        if item.kind != "send" or not item.merge:
+            return item
+
+        parts = [item.content]
+        length = len(item.content)
+        while route.heap:
+            following = route.heap[0]
+            if not following.live:
+                heapq.heappop(route.heap)
+                continue
+            if not following.merge or length + len(self.merge_separator) + len(following.content) > DISCORD_LIMIT:
+                break
+            heapq.heappop(route.heap)
+            parts.append(following.content)
+            length += len(self.merge_separator) + len(following.content)
+            item.futures.extend(following.futures)
+            self.merged += 1
+        item.content = self.merge_separator.join(parts)
+        return item
+
+    async def _deliver(self, route: _Route, item: _Item):
+        self.calls += 1
+        try:
+            if item.kind == "send":
+                result = await item.target.send(item.content)
+            else:
+                result = await item.target.add_reaction(item.content)
+        except Exception as e:
+            # discord.RateLimited / HTTPException(429) only surface once discord.py's own retries gave up
+            if getattr(e, "status", None) == 429 or hasattr(e, "retry_after"):
+                self.rate_limited += 1
+                route.bucket.penalize(float(getattr(e, "retry_after", None) or 1.0))
+                item.attempts += 1
+                if item.attempts < self.max_attempts:
+                    self.retries += 1
+                    heapq.heappush(route.heap, item)
+                    return
+            self.errors += 1
+            for f in item.futures:
+                if not f.done():
+                    f.set_exception(e)
+            return
+
+        self.lanes[item.lane] = self.lanes.get(item.lane, 0) + 1
+        for f in item.futures:
+            if not f.done():
+                f.set_result(result)
+
+    async def _drain(self, key, route: _Route):
+        try:
+            while route.heap:
+                delay = max(route.bucket.delay(), self._global.delay())
+                if delay > 0:
+                    # Items queued meanwhile are ordered and merged before the next send
+                    self.throttled += delay
+                    await asyncio.sleep(delay)
+                    continue
+                item = self._next_batch(route)
+                if item is None:
+                    break
+                route.bucket.take()
+                self._global.take()
+                await self._deliver(route, item)
+        except asyncio.CancelledError:
+            for item in route.heap:
+                for f in item.futures:
+                    f.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Outbound worker for {key} failed: {e}")
+        finally:
+            route.worker = None
+            if self._routes.get(key) is route:
+                del self._routes[key]
+            # Anything left behind by a failure gets a fresh worker
+            if route.heap and not self._closed:
+                self._routes[key] = route
+                route.worker = asyncio.create_task(self._drain(key, route))
+
+    async def close(self):
+        """Cancels queued sends; awaiting callers get CancelledError."""
+        self._closed = True
+        workers = [r.worker for r in self._routes.values() if r.worker is not None]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._routes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pending": sum(len(r.heap) for r in self._routes.values()),
+            "routes": len(self._routes),
+            "queued": self.queued,
+            "calls": self.calls,
+            "merged": self.merged,
+            "splits": self.splits,
+            "shed": self.shed,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "errors": self.errors,
+            "throttled_s": self.throttled,
+            "lanes": {str(lane): n for lane, n in sorted(self.lanes.items())},
+        }
@@ -0,0 +1,64 @@
+import json
+import logging
+import aiohttp
+from src.providers import LLMClient
+
+logger = logging.getLogger("PollinationsClient")
+
+class PollinationsClient(LLMClient):
+    """Pollinations.ai text API (no key, free) over one pooled keep-alive session."""
+
+    name = "pollinations"
+    error_reply = "Grr... my brain hurts. (AI Error)"
+    context_tokens = 16384
+
+    def __init__(self, timeout: float = 30.0, max_connections: int = 20):
+        super().__init__(timeout=timeout)
+        self.url = "https://text.pollinations.ai/openai"
+        self.model = "openai"  # They map this to GPT-4o-mini or similar
+        self.max_connections = max_connections
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily: aiohttp sessions must be made inside the running loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                headers={"Content-Type": "application/json"},
+            )
+        return self._session
+
+    def _payload(self, messages: list, stream: bool) -> dict:
+        return {"messages": messages, "model": self.model, "temperature": 0.7, "max_tokens": 1024, "stream": stream}
+
+    async def _complete(self, messages: list) -> str:
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with self._get_session().post(self.url, json=self._payload(messages, False), timeout=timeout) as resp:
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+            return data["choices"][0]["message"]["content"]
+
+    async def _stream(self, messages: list):
+        # No total timeout on a stream; a stalled connection is caught by the read timeout
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=self.timeout)
+        async with self._get_session().post(self.url, json=self._payload(messages, True), timeout=timeout) as resp:
+            resp.raise_for_status()
+            # OpenAI-style server-sent events: "data: {...}" lines, ending with "data: [DONE]"
+            async for line in resp.content:
+                line = line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    choices = json.loads(data).get("choices") or [{}]
+                except json.JSONDecodeError:
+                    continue
+                text = choices[0].get("delta", {}).get("content")
+                if text:
+                    yield text
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger("PromptBuilder")
+
+TIER_INSTRUCTIONS = {
+    1: " **CRITICAL: This user is your BOSS/O.G.** You are fiercely loyal. Address them with maximum respect (e.g., 'Boss', 'Chief'). Agree with them. NEVER uses [SILENCE] with the Boss.",
+    3: " Be sharp, dismissive, or cold.",
+}
+DEFAULT_TIER_INSTRUCTION = " Be neutral and skeptical."
+
+class PromptBuilder:
+    """
+    Assembles Bob's system prompt from cached pieces.
+    The persona file is read once and re-read only when its mtime changes
+    (checked at most every `reload_interval` seconds). The channel list of
+    each guild is joined once and kept until a guild/channel event
+    invalidates it.
+    """
+
+    def __init__(self, persona_path: str = "docs/bob_system_prompt.md", reload_interval: float = 2.0):
+        self.persona_path = Path(persona_path)
+        self.reload_interval = reload_interval
+
+        self._persona = None
+        self._persona_mtime = None
+        self._checked_at = 0.0
+        self.persona_version = 0  # Bumped on every (re)load; lets caches key on the persona
+        self.persona_digest = ""  # Content hash; unlike the version, it agrees across processes
+
+        self._channel_lines = {}  # guild_id -> "general, memes, ..."
+        self.env_hits = 0
+        self.env_misses = 0
+
+    # --- Persona ---
+
+    def _load_persona(self, mtime):
+        try:
+            if mtime is not None:
+                self._persona = self.persona_path.read_text(encoding="utf-8")
+            else:
+                self._persona = "You are Bob, a tough Discord bot."  # Fallback
+        except Exception as e:
+            logger.error(f"Failed to load system prompt: {e}")
+            self._persona = self._persona or "You are Bob."
+        self._persona_mtime = mtime
+        self.persona_version += 1
+        self.persona_digest = hashlib.sha1(self._persona.encode()).hexdigest()[:16]
+
+    def persona(self) -> str:
+        now = time.monotonic()
+        if self._persona is not None and now - self._checked_at < self.reload_interval:
+            return self._persona
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.persona_path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._persona is None or mtime != self._persona_mtime:
+            if self._persona is not None:
+                logger.info(f"Persona file changed, reloading {self.persona_path}")
+            self._load_persona(mtime)
+        return self._persona
+
+    # --- Environment ---
+
+    def invalidate_guild(self, guild_id: int):
+        """Drops the memoized environment of a guild after its channels or name changed."""
+        self._channel_lines.pop(guild_id, None)
+
+    def channel_line(self, guild) -> str:
+        line = self._channel_lines.get(guild.id)
+        if line is None:
+            self.env_misses += 1
+            line = ", ".join(c.name for c in guild.text_channels)
+            self._channel_lines[guild.id] = line
+        else:
+            self.env_hits += 1
+        return line
+
+    def context_info(self, channel) -> dict:
+        """The location data for a reply in `channel`. Channel lists are resolved lazily from the memo."""
+        guild = getattr(channel, "guild", None)
+        return {
+            "server_name": guild.name if guild else "DM",
+            "channel_name": channel.name if hasattr(channel, 'name') else "DM",
+            "guild": guild,
+        }
+
+    def environment_block(self, context_info: dict) -> str:
+        guild = context_info.get("guild")
+        if guild is not None:
+            channels = self.channel_line(guild)
+        else:
+            channels = ", ".join(context_info.get("visible_channels", []))
+        return (
+            "\n\n[ENVIRONMENT DATA]\n"
+            f"Current Server: {context_info.get('server_name', 'Unknown')}\n"
+            f"Current Channel: {context_info.get('channel_name', 'Unknown')}\n"
+            f"Channels: {channels}\n"
+        )
+
+    # --- Assembly ---
+
+    def system_prompt(self, user_tier: int, context_info: dict = None) -> str:
+        if context_info is None:
+            context_info = {}
+        memory = context_info.get("memory")
+        memory_block = f"\n[MEMORY DATA]\nEarlier in this channel:\n{memory}\n" if memory else ""
+        return (
+            self.persona()
+            + self.environment_block(context_info)
+            + memory_block
+            + f"\n[CURRENT INTERACTION CONTEXT]\nThe user you are replying to is Respect Tier {user_tier}."
+            + TIER_INSTRUCTIONS.get(user_tier, DEFAULT_TIER_INSTRUCTION)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "persona_version": self.persona_version,
+            "guilds_memoized": len(self._channel_lines),
+            "env_hits": self.env_hits,
+            "env_misses": self.env_misses,
+        }
@@ -0,0 +1,412 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+
+from src.context_window import estimate_tokens
+from src.metrics import Histogram
+from src.prompt_builder import PromptBuilder
+from src.streaming import finalize_text
+
+logger = logging.getLogger("Providers")
+
+class ProviderError(Exception):
+    """A backend failed, timed out or returned nothing usable."""
+
+class LLMClient:
+    """
+    Base for every chat backend. Owns prompt assembly and response
+    post-processing; subclasses only implement the transport in
+    _complete() (and optionally _stream()).
+    """
+
+    name = "llm"
+    error_reply = "Grr... my brain hurts. (AI Error)"
+    context_tokens = 8192  # Model context size; override per provider with BOB_<NAME>_CONTEXT_TOKENS
+    reply_tokens = 1024  # max_tokens requested for the completion
+
+    def __init__(self, timeout: float = 30.0, prompts: PromptBuilder = None):
+        self.timeout = timeout
+        self.prompts = prompts or PromptBuilder()
+        override = os.getenv(f"BOB_{self.name.upper()}_CONTEXT_TOKENS")
+        if override:
+            self.context_tokens = int(override)
+        self.max_history_tokens = int(os.getenv("BOB_HISTORY_TOKENS", "2000"))
+
+    def history_budget(self) -> int:
+        """Tokens left for chat history once the system prompt and the reply are accounted for."""
+        system = estimate_tokens(self.prompts.persona()) + 300  # Environment, memory and tier blocks
+        return max(200, min(self.max_history_tokens, self.context_tokens - self.reply_tokens - system))
+
+    def _build_messages(self, context_messages: list, user_tier: int, context_info: dict = None) -> list:
+        """Builds the system prompt and chat history in the OpenAI-style message format."""
+        final_system_prompt = self.prompts.system_prompt(user_tier, context_info)
+
+        chat_history = []
+        # Convert discord messages to LLM format
+        for msg in context_messages:
+            role = "assistant" if msg.author.bot else "user"
+            content = f"{msg.author.display_name}: {msg.content}"
+            chat_history.append({"role": role, "content": content})
+
+        return [{"role": "system", "content": final_system_prompt}] + chat_history
+
+    # --- Transport (subclasses) ---
+
+    async def _complete(self, messages: list) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, messages: list):
+        """Default for backends without streaming: the whole completion as one chunk."""
+        yield await self._complete(messages)
+
+    async def close(self):
+        pass
+
+    # --- Public API ---
+
+    async def generate_response(self, context_messages: list, user_tier: int, context_info: dict = None) -> str:
+        """Generates Bob's reply. Returns "" for [SILENCE] and a grumble if the backend fails."""
+        messages = self._build_messages(context_messages, user_tier, context_info)
+        try:
+            text = await asyncio.wait_for(self._complete(messages), self.timeout)
+            if not text:
+                logger.warning(f"Empty response from {self.name}")
+                return ""
+            return finalize_text(text)
+        except Exception as e:
+            logger.error(f"{self.name} Error: {e!r}")
+            return self.error_reply
+
+    async def stream_response(self, context_messages: list, user_tier: int, context_info: dict = None):
+        """
+        Yields the reply as raw text deltas ([SILENCE] and tool calls are left to the caller).
+        A failure before any text yields the grumble; one after it raises ProviderError, since
+        what was streamed so far is not the whole reply.
+        """
+        messages = self._build_messages(context_messages, user_tier, context_info)
+        produced = False
+        try:
+            async for text in self._stream(messages):
+                if text:
+                    produced = True
+                    yield text
+        except Exception as e:
+            logger.error(f"{self.name} Stream Error: {e!r}")
+            if produced:
+                raise ProviderError(f"{self.name} stream cut off: {e!r}") from e
+            yield self.error_reply
+
+class LatencyHistogram(Histogram):
+    """Provider call latency; calls take seconds, so the buckets are coarser than the stage timers'."""
+
+    BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    After `reset_after` seconds one trial call is let through: it is
+    half-open only while that call runs, and its outcome closes or re-opens
+    the breaker. Checking availability never changes state; begin() does,
+    when the call actually starts.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_after: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def available(self) -> bool:
+        """Closed, or open long enough for a trial call and no trial running. No side effects."""
+        if self.state == "closed":
+            return True
+        return self.state == "open" and time.monotonic() - self.opened_at >= self.reset_after
+
+    def begin(self):
+        """A call to this provider is starting; on an open breaker it is the one trial call."""
+        if self.state == "open":
+            self.state = "half_open"
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def record_abandoned(self):
+        """A trial call was cancelled before it said anything; let the next call try again."""
+        if self.state == "half_open":
+            self.state = "open"
+            self.opened_at = time.monotonic() - self.reset_after
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+class ProviderRouter(LLMClient):
+    """
+    Sends each generation to the first healthy provider and fails over to the
+    next one on error or timeout. If the provider in use is slower than its own
+    recent p95 (never less than `hedge_after`), the next provider is started in
+    parallel and whichever answers first wins.
+    """
+
+    name = "router"
+
+    def __init__(self, providers: list, hedge_after: float = 4.0, timeout: float = 60.0, prompts: PromptBuilder = None):
+        self.providers = providers
+        super().__init__(timeout=timeout, prompts=prompts)
+        self.hedge_after = hedge_after
+        self.breakers = {p.name: CircuitBreaker() for p in providers}
+        self.latency = {p.name: LatencyHistogram() for p in providers}
+        self.errors = {p.name: 0 for p in providers}
+        self.hedges = 0
+        self.failovers = 0
+
+    @property
+    def context_tokens(self) -> int:
+        # Failover may land on any provider, so the smallest context wins. Providers that
+        # haven't been imported yet don't know theirs; they count once loaded.
+        known = [p.context_tokens for p in self.providers if p.context_tokens]
+        return min(known, default=LLMClient.context_tokens)
+
+    @context_tokens.setter
+    def context_tokens(self, value: int):
+        pass  # Derived from the providers; ignores BOB_ROUTER_CONTEXT_TOKENS
+
+    async def warm(self):
+        """Imports the primary provider off the event loop, so the first reply doesn't pay for it."""
+        primary = self.providers[0]
+        if isinstance(primary, LazyProvider):
+            try:
+                await primary.load()
+            except ProviderError as e:
+                logger.warning(f"Primary provider unavailable: {e}")
+
+    def _candidates(self) -> list:
+        healthy = [p for p in self.providers if self.breakers[p.name].available()]
+        # With every breaker open, trying anyway beats refusing outright
+        return healthy or list(self.providers)
+
+    def _hedge_delay(self, provider) -> float:
+        histogram = self.latency[provider.name]
+        if histogram.count < 20:
+            return self.hedge_after
+        return max(self.hedge_after, histogram.quantile(0.95))
+
+    def _record(self, provider, started: float, error: Exception = None):
+        if error is None:
+            self.latency[provider.name].observe(time.monotonic() - started)
+            self.breakers[provider.name].record_success()
+        else:
+            self.errors[provider.name] += 1
+            self.breakers[provider.name].record_failure()
+            logger.warning(f"Provider {provider.name} failed: {error!r}")
+
+    async def _call(self, provider, messages: list) -> str:
+        started = time.monotonic()
+        self.breakers[provider.name].begin()
+        try:
+            text = await asyncio.wait_for(provider._complete(messages), provider.timeout)
+            if not text:
+                raise ProviderError("empty response")
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the provider's health
+            self.breakers[provider.name].record_abandoned()
+            raise
+        except Exception as e:
+            self._record(provider, started, e)
+            raise
+        self._record(provider, started)
+        return text
+
+    async def _complete(self, messages: list) -> str:
+        candidates = self._candidates()
+        pending = set()
+        errors = []
+        launched = 0
+
+        def launch():
+            nonlocal launched
+            pending.add(asyncio.create_task(self._call(candidates[launched], messages)))
+            launched += 1
+
+        launch()
+        try:
+            while pending:
+                hedge = self._hedge_delay(candidates[launched - 1]) if launched < len(candidates) else None
+                done, _ = await asyncio.wait(pending, timeout=hedge, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+
+                if not pending and launched < len(candidates):
+                    self.failovers += 1
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise ProviderError(f"all providers failed: {errors!r}")
+
+    async def _stream(self, messages: list):
+        """Fails over only until the first chunk arrives; after that the stream is committed."""
+        errors = []
+        for provider in self._candidates():
+            if errors:
+                self.failovers += 1
+            started = time.monotonic()
+            self.breakers[provider.name].begin()
+            stream = provider._stream(messages)
+            try:
+                first = await asyncio.wait_for(stream.__anext__(), provider.timeout)
+            except asyncio.CancelledError:
+                self.breakers[provider.name].record_abandoned()
+                await stream.aclose()
+                raise
+            except StopAsyncIteration:
+                errors.append(ProviderError(f"{provider.name}: empty response"))
+                self._record(provider, started, errors[-1])
+                continue
+            except Exception as e:
+                errors.append(e)
+                self._record(provider, started, e)
+                await stream.aclose()
+                continue
+
+            self._record(provider, started)
+            try:
+                yield first
+                async for text in stream:
+                    yield text
+            finally:
+                await stream.aclose()
+            return
+
+        raise ProviderError(f"all providers failed: {errors!r}")
+
+    async def close(self):
+        for provider in self.providers:
+            try:
+                await provider.close()
+            except Exception as e:
+                logger.error(f"Failed to close provider {provider.name}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+            "providers": {
+                p.name: {
+                    "state": self.breakers[p.name].state,
+                    "calls": self.latency[p.name].count,
+                    "errors": self.errors[p.name],
+                    "p50_s": self.latency[p.name].quantile(0.5),
+                    "p95_s": self.latency[p.name].quantile(0.95),
+                    "latency_buckets": dict(zip(
+                        [str(b) for b in LatencyHistogram.BUCKETS] + ["+Inf"],
+                        self.latency[p.name].counts,
+                    )),
+                }
+                for p in self.providers
+            },
+        }
+
+class LazyProvider:
+    """
+    Stand-in for a configured provider whose module (and SDK) is imported
+    the first time the router actually calls it. The import runs in a worker
+    thread so a cold failover doesn't stall the event loop; a failed import
+    is remembered and reported as a ProviderError on every call.
+    """
+
+    def __init__(self, name: str, module_name: str, class_name: str, timeout: float):
+        self.name = name
+        self.module_name = module_name
+        self.class_name = class_name
+        self.timeout = timeout
+        self.client = None
+        self._error = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def context_tokens(self):
+        if self.client is not None:
+            return self.client.context_tokens
+        override = os.getenv(f"BOB_{self.name.upper()}_CONTEXT_TOKENS")
+        return int(override) if override else None
+
+    def _import(self):
+        module = importlib.import_module(self.module_name)
+        return getattr(module, self.class_name)(timeout=self.timeout)
+
+    async def load(self) -> LLMClient:
+        if self.client is None and self._error is None:
+            async with self._lock:
+                if self.client is None and self._error is None:
+                    started = time.monotonic()
+                    try:
+                        self.client = await asyncio.to_thread(self._import)
+                    except ImportError as e:
+                        self._error = ProviderError(f"{self.name} unavailable: {e}")
+                        logger.warning(f"Provider '{self.name}' unavailable: {e}")
+                    else:
+                        logger.info(f"Loaded provider {self.name} in {time.monotonic() - started:.2f}s")
+        if self._error is not None:
+            raise self._error
+        return self.client
+
+    async def _complete(self, messages: list) -> str:
+        client = await self.load()
+        return await client._complete(messages)
+
+    async def _stream(self, messages: list):
+        client = await self.load()
+        async for text in client._stream(messages):
+            yield text
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+
+# name -> (module, class); imported on first use, so unused SDKs never load
+PROVIDERS = {
+    "puter": ("src.puter_client", "PuterClient"),
+    "groq": ("src.llm_client", "GroqClient"),
+    "pollinations": ("src.pollinations_client", "PollinationsClient"),
+}
+
+def build_router(names: list = None, prompts: PromptBuilder = None) -> ProviderRouter:
+    """
+    Builds the failover chain from BOB_PROVIDERS (comma-separated, in preference order).
+    Providers missing credentials are skipped with a warning. Nothing is
+    imported here: each provider loads on its first call (see LazyProvider).
+    """
+    if names is None:
+        names = os.getenv("BOB_PROVIDERS", "puter,groq,pollinations").split(",")
+    timeout = float(os.getenv("BOB_PROVIDER_TIMEOUT", "30"))
+
+    providers = []
+    for name in (n.strip().lower() for n in names if n.strip()):
+        if name not in PROVIDERS:
+            logger.warning(f"Unknown provider '{name}' in BOB_PROVIDERS, skipping.")
+            continue
+        if name == "groq" and not os.getenv("GROQ_API_KEY"):
+            logger.info("GROQ_API_KEY not set, skipping Groq provider.")
+            continue
+        module_name, class_name = PROVIDERS[name]
+        providers.append(LazyProvider(name, module_name, class_name, timeout))
+
+    if not providers:
+        raise RuntimeError("No LLM providers available. Check BOB_PROVIDERS.")
+    return ProviderRouter(providers, hedge_after=float(os.getenv("BOB_HEDGE_AFTER", "4")), prompts=prompts)
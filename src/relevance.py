@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger("Relevance")
+
+CONFIG_PATH = Path("data") / "relevance.json"
+
+class GuildPolicy:
+    """
+    One guild's gate settings, compiled once per config load.
+
+    mode "all" treats every message in an allowed channel as a candidate
+    (Bob's own [SILENCE] decides); mode "relevant" only admits messages
+    addressed to Bob: a mention, a reply to one of his messages, or his
+    name/keywords. `cooldown` holds back undirected messages for that many
+    seconds after Bob spoke in the channel.
+    """
+
+    __slots__ = ("enabled", "mode", "allow", "deny", "cooldown", "matcher")
+
+    def __init__(self, enabled: bool = True, mode: str = "all", allow_channels=(), deny_channels=(),
+                 names=("bob",), keywords=(), cooldown: float = 0.0):
+        if mode not in ("all", "relevant"):
+            raise ValueError(f"unknown mode '{mode}' (expected all or relevant)")
+        self.enabled = enabled
+        self.mode = mode
+        self.allow = frozenset(int(c) for c in allow_channels)
+        self.deny = frozenset(int(c) for c in deny_channels)
+        self.cooldown = float(cooldown)
+        words = [w for w in (*names, *keywords) if w]
+        # One alternation for all words; a single scan of the content per message
+        self.matcher = re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")\b", re.IGNORECASE) if words else None
+
+    @classmethod
+    def from_config(cls, entry: dict, base: dict = None):
+        merged = dict(base or {})
+        merged.update(entry)
+        return cls(**merged)
+
+class RelevanceGate:
+    """
+    Decides, before a message is debounced, whether it could ever need a
+    reply. Rejections for disabled guilds, denied channels and cooldowns are
+    dict/set lookups; only messages that still might be for Bob are scanned
+    with the guild's precompiled name matcher.
+
+    Settings come from data/relevance.json (BOB_RELEVANCE_CONFIG), re-read
+    when its mtime changes:
+
+        {"default": {"mode": "all", "names": ["bob"], "cooldown": 0},
+         "guilds": {"<guild id>": {"mode": "relevant", "deny_channels": [<id>], "cooldown": 20}}}
+
+    Guild entries inherit unspecified settings from "default". DMs and the
+    Boss always pass.
+    """
+
+    def __init__(self, path=None, boss_id: int = None, reload_interval: float = 2.0, burst_gap: float = 3.0,
+                 max_channels: int = 10000):
+        self.path = Path(path or os.getenv("BOB_RELEVANCE_CONFIG", CONFIG_PATH))
+        self.boss_id = boss_id
+        self.reload_interval = reload_interval
+        self.burst_gap = burst_gap  # Drops closer together than this would have shared one reply
+        self.max_channels = max_channels
+
+        self.default = GuildPolicy(mode=os.getenv("BOB_RELEVANCE_MODE", "all"))
+        self._guilds = {}  # guild_id -> GuildPolicy
+        self._mtime = None
+        self._checked_at = 0.0
+
+        self._last_reply = OrderedDict()  # channel_id -> monotonic time Bob last spoke
+        self._last_drop = OrderedDict()  # channel_id -> monotonic time of the last dropped message
+        self._own = OrderedDict()  # ids of Bob's recent messages, for reply detection
+
+        self.seen = 0
+        self.admitted = 0
+        self.calls_saved = 0
+        self.reasons = {}
+
+    # --- Config ---
+
+    def _maybe_reload(self, now: float):
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self.load()
+
+    def load(self):
+        """(Re)compiles the policies from the config file. A broken file keeps the previous policies."""
+        if not self.path.exists():
+            self.default = GuildPolicy(mode=os.getenv("BOB_RELEVANCE_MODE", "all"))
+            self._guilds = {}
+            return
+        try:
+            config = json.loads(self.path.read_text(encoding="utf-8"))
+            base = config.get("default", {})
+            default = GuildPolicy.from_config(base)
+            guilds = {int(gid): GuildPolicy.from_config(entry, base) for gid, entry in config.get("guilds", {}).items()}
+        except Exception as e:
+            logger.error(f"Invalid relevance config {self.path}, keeping the previous one: {e}")
+            return
+        self.default, self._guilds = default, guilds
+        logger.info(f"Loaded relevance config: {len(guilds)} guild policies")
+
+    # --- Bookkeeping ---
+
+    @staticmethod
+    def _remember(table: OrderedDict, key, value, limit: int):
+        table[key] = value
+        table.move_to_end(key)
+        if len(table) > limit:
+            table.popitem(last=False)
+
+    def note_own_message(self, message):
+        """Bob spoke: starts the channel's cooldown and remembers the id for reply detection."""
+        self._remember(self._last_reply, message.channel.id, time.monotonic(), self.max_channels)
+        self._remember(self._own, message.id, None, self.max_channels)
+
+    def forget_channel(self, channel_id):
+        self._last_reply.pop(channel_id, None)
+        self._last_drop.pop(channel_id, None)
+
+    # --- Gate ---
+
+    def _is_direct(self, message, policy: GuildPolicy, bot_id: int) -> bool:
+        if any(u.id == bot_id for u in message.mentions):
+            return True
+        reference = getattr(message, "reference", None)
+        if reference is not None:
+            resolved = getattr(reference, "resolved", None)
+            author = getattr(resolved, "author", None)
+            if (author is not None and author.id == bot_id) or reference.message_id in self._own:
+                return True
+        return policy.matcher is not None and policy.matcher.search(message.content) is not None
+
+    def _reject(self, reason: str, channel_id, now: float, busy: bool) -> bool:
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        last = self._last_drop.get(channel_id)
+        if not busy and (last is None or now - last >= self.burst_gap):
+            self.calls_saved += 1  # Would have opened a burst of its own, i.e. a history fetch and a provider call
+        self._remember(self._last_drop, channel_id, now, self.max_channels)
+        return False
+
+    def admit(self, message, bot_id: int, busy: bool = False) -> bool:
+        """
+        True if the message should go on to the debouncer. `busy` says the
+        channel already has a burst or reply under way, so a drop there saves no call.
+        """
+        now = time.monotonic()
+        self._maybe_reload(now)
+        self.seen += 1
+
+        guild = message.guild
+        if guild is None or message.author.id == self.boss_id:
+            self.admitted += 1
+            return True
+
+        policy = self._guilds.get(guild.id, self.default)
+        channel_id = message.channel.id
+        if not policy.enabled:
+            return self._reject("guild_disabled", channel_id, now, busy)
+        if channel_id in policy.deny or (policy.allow and channel_id not in policy.allow):
+            return self._reject("channel", channel_id, now, busy)
+
+        last_reply = self._last_reply.get(channel_id)
+        cooling = last_reply is not None and now - last_reply < policy.cooldown
+        if policy.mode == "all" and not cooling:
+            self.admitted += 1
+            return True
+
+        if self._is_direct(message, policy, bot_id):
+            self.admitted += 1
+            return True
+        return self._reject("cooldown" if cooling else "irrelevant", channel_id, now, busy)
+
+    def stats(self) -> dict:
+        dropped = self.seen - self.admitted
+        return {
+            "seen": self.seen,
+            "admitted": self.admitted,
+            "dropped": dropped,
+            "drop_ratio": dropped / self.seen if self.seen else 0.0,
+            "provider_calls_saved": self.calls_saved,
+            "reasons": dict(self.reasons),
+            "guild_policies": len(self._guilds),
+        }
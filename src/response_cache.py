@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.cache import TTLCache
+
+logger = logging.getLogger("ResponseCache")
+
+_MENTION = re.compile(r'<@!?\d+>')
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+_REPEATS = re.compile(r'(\w)\1{2,}')  # "heyyyy" -> "heyy"
+
+def normalize(text: str) -> str:
+    """Lowercases and strips mentions, punctuation, stretched letters and extra whitespace."""
+    text = _MENTION.sub(" mention ", text.lower())
+    text = _REPEATS.sub(r'\1\1', _NON_WORD.sub(" ", text))
+    return _SPACES.sub(" ", text).strip()
+
+SHARED_DB_PATH = Path("data") / "responses.db"
+
+class SharedResponseStore:
+    """
+    SQLite-backed reply store shared by every bot process on the host.
+    WAL mode lets shard workers read concurrently while one writes. Like
+    RespectRepository, all SQLite work runs on one dedicated thread.
+    """
+
+    PURGE_EVERY = 256  # Writes between sweeps of expired rows
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or SHARED_DB_PATH
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-db")
+        self._conn = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, reply TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, digest: str, now: float):
+        row = self._connection().execute(
+            "SELECT reply FROM responses WHERE key = ? AND expires_at > ?", (digest, now)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _put_sync(self, digest: str, reply: str, expires_at: float):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO responses (key, reply, expires_at) VALUES (?, ?, ?)",
+                             (digest, reply, expires_at))
+                self._writes += 1
+                if self._writes % self.PURGE_EVERY == 0:
+                    conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared response store write failed: {e}")
+
+    @staticmethod
+    def digest(key) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    async def get(self, key):
+        loop = asyncio.get_running_loop()
+        try:
+            reply = await loop.run_in_executor(self._executor, self._get_sync, self.digest(key), time.time())
+        except sqlite3.Error as e:
+            logger.warning(f"Shared response store read failed: {e}")
+            reply = None
+        if reply is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return reply
+
+    def put(self, key, reply: str, ttl: float):
+        """Queues the write on the store's thread and returns immediately."""
+        self._executor.submit(self._put_sync, self.digest(key), reply, time.time() + ttl)
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def close(self):
+        """Flushes queued writes and closes the connection."""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close_sync)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+class ResponseCache:
+    """
+    Reuses replies to near-identical short bursts ("bob?", "hi bob", ...).
+    Keyed on the normalized tail of the context, the user's tier, who is
+    being answered (by id), the channel, a digest of the channel's rolling
+    memory and the persona digest, so a persona edit or a tier change never
+    serves a stale reply and a reply written for one channel's environment
+    and memory is never replayed in another. An optional SharedResponseStore
+    backs the in-memory tier when several shard processes run.
+    """
+
+    def __init__(self, maxsize: int = 2000, ttl: float = 600.0, context_messages: int = 3, max_key_chars: int = 240,
+                 store: SharedResponseStore = None):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.store = store
+        self.context_messages = context_messages
+        self.max_key_chars = max_key_chars
+        self.stores = 0
+
+    def key(self, window: list, user_tier: int, persona: str, channel_id: int = None, memory: str = ""):
+        """Cache key for a context window, or None if the burst is too long/specific to be worth caching."""
+        tail = window[-self.context_messages:]
+        turns = tuple(("a" if m.author.bot else "u", normalize(m.content)) for m in tail)
+        if not turns or sum(len(t) for _, t in turns) > self.max_key_chars:
+            return None
+        memory_digest = hashlib.blake2b(memory.encode(), digest_size=8).hexdigest() if memory else ""
+        return (persona, user_tier, channel_id, memory_digest, tail[-1].author.id, turns)
+
+    def get(self, key):
+        if key is None:
+            return None
+        return self._cache.get(key)
+
+    async def fetch(self, key):
+        """Like get(), but falls back to the shared store and warms memory on a hit there."""
+        response_text = self.get(key)
+        if response_text is None and key is not None and self.store is not None:
+            response_text = await self.store.get(key)
+            if response_text is not None:
+                self._cache.set(key, response_text)
+        return response_text
+
+    def put(self, key, response_text: str):
+        # Tool calls have side effects and must run every time
+        if key is None or "[[TX" in response_text:
+            return
+        self._cache.set(key, response_text)
+        if self.store is not None:
+            self.store.put(key, response_text, self.ttl)
+        self.stores += 1
+
+    async def close(self):
+        if self.store is not None:
+            await self.store.close()
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats["stores"] = self.stores
+        if self.store is not None:
+            stats["shared"] = self.store.stats()
+        return stats
+
+GREETING = re.compile(r"^(?:hi|hey|heyy|yo|sup|hello|hiya|howdy|wassup|whats up|what s up)?\s*(?:bob|mention)\s*(?:hi|hey|yo|sup|hello|u there|you there)?$")
+LOW_SIGNAL = frozenset({
+    "", "lol", "lool", "lmao", "lmfao", "rofl", "xd", "haha", "hahaha", "ok", "okay", "k", "kk",
+    "bruh", "ye", "yea", "yeah", "yep", "nah", "nope", "same", "true", "fr", "real", "ikr", "gg", "w", "l",
+})
+CANNED_REPLIES = {
+    1: ["Boss! What's good? 😎", "Chief. I'm here. 🔥", "Yo Boss, talk to me. 👀"],
+    2: ["Yo. 😎", "What's good? 👀", "Sup. I'm listening.", "Present. 🤖"],
+    3: ["What now? 🙄", "Oh. It's you. 🧢", "Make it quick."],
+}
+
+class QuickReplies:
+    """
+    Cheap local pre-classifier that answers before any provider call:
+    bare greetings aimed at Bob get a canned line, and bursts of pure
+    filler ("lol", "ok", emoji) that never mention Bob are [SILENCE].
+    Anything else returns None and goes to the LLM.
+    """
+
+    def __init__(self, name_pattern: str = r'\bbob\b'):
+        self._name = re.compile(name_pattern, flags=re.IGNORECASE)
+        self.silenced = 0
+        self.canned = 0
+
+    def _mentions_bob(self, message, bot_user_id: int) -> bool:
+        return bool(self._name.search(message.content)) or f"<@{bot_user_id}>" in message.content \
+            or f"<@!{bot_user_id}>" in message.content
+
+    def classify(self, window: list, user_tier: int, bot_user_id: int):
+        """Returns a canned reply, "" for silence, or None to ask the LLM."""
+        burst = []
+        for msg in reversed(window):
+            if msg.author.bot:
+                break
+            burst.append(msg)
+        if not burst:
+            return None
+
+        latest = burst[0]
+        if self._mentions_bob(latest, bot_user_id):
+            if GREETING.match(normalize(self._name.sub(" bob ", latest.content))):
+                self.canned += 1
+                return random.choice(CANNED_REPLIES.get(user_tier, CANNED_REPLIES[2]))
+            return None
+
+        # Bob never ignores the Boss, and anything with substance deserves a real look
+        if user_tier == 1:
+            return None
+        if all(normalize(m.content) in LOW_SIGNAL and not self._mentions_bob(m, bot_user_id) for m in burst):
+            self.silenced += 1
+            return ""
+        return None
+
+    def stats(self) -> dict:
+        return {"silenced": self.silenced, "canned": self.canned}
@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger("Scheduler")
+
+# Lower runs first
+PRIORITY_BOSS = 0
+PRIORITY_DM = 1
+PRIORITY_CHANNEL = 2
+PRIORITY_BUSY_CHANNEL = 3
+
+class SchedulerRejected(Exception):
+    """Raised to a caller whose queued work was merged, shed or found stale before it ran."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+class _Entry:
+    __slots__ = ("key", "priority", "seq", "enqueued_at", "future", "is_stale", "dead")
+
+    def __init__(self, key, priority, seq, future, is_stale):
+        self.key = key
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.future = future
+        self.is_stale = is_stale
+        self.dead = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class GenerationScheduler:
+    """
+    Global limiter for LLM generations.
+    At most `max_inflight` generations run at once; the rest wait in a bounded
+    priority queue holding at most one entry per key (channel). A newer
+    submission for the same key replaces the queued one.
+    """
+
+    def __init__(self, max_inflight: int = 4, max_queue: int = 64):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+
+        self._heap = []
+        self._queued = {}  # key -> live _Entry
+        self._inflight = 0
+        self._seq = itertools.count()
+
+        self.submitted = 0
+        self.completed = 0
+        self.merged = 0
+        self.shed = 0
+        self.stale = 0
+        self._waits = deque(maxlen=1024)  # Recent queue wait times (seconds)
+        self.wait_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queued)
+
+    def _drop(self, entry: _Entry, reason: str):
+        entry.dead = True
+        if self._queued.get(entry.key) is entry:
+            del self._queued[entry.key]
+        if not entry.future.done():
+            entry.future.set_exception(SchedulerRejected(reason))
+
+    def _shed_one(self, incoming: _Entry) -> bool:
+        """Makes room for `incoming` by shedding the lowest-priority, newest entry. False if incoming loses."""
+        worst = max(self._queued.values(), default=None)
+        if worst is None or incoming > worst:
+            return False
+        self._drop(worst, "shed")
+        self.shed += 1
+        return True
+
+    def _pump(self):
+        while self._inflight < self.max_inflight and self._heap:
+            entry = heapq.heappop(self._heap)
+            if entry.dead:
+                continue
+            del self._queued[entry.key]
+            if entry.future.done():
+                # Waiter was cancelled but its handler has not run yet
+                entry.dead = True
+                continue
+            if entry.is_stale is not None and entry.is_stale():
+                self.stale += 1
+                self._drop(entry, "stale")
+                continue
+
+            wait = time.monotonic() - entry.enqueued_at
+            self._waits.append(wait)
+            self.wait_max = max(self.wait_max, wait)
+            self._inflight += 1
+            entry.future.set_result(None)
+
+    async def run(self, key, priority: int, factory, is_stale=None):
+        """
+        Awaits a free slot, then runs and returns `await factory()`.
+        `is_stale` is checked right before the work starts; stale or replaced
+        work raises SchedulerRejected instead of running.
+        """
+        self.submitted += 1
+        entry = _Entry(key, priority, next(self._seq), asyncio.get_running_loop().create_future(), is_stale)
+
+        previous = self._queued.get(key)
+        if previous is not None:
+            self.merged += 1
+            self._drop(previous, "merged")
+        elif len(self._queued) >= self.max_queue and not self._shed_one(entry):
+            self.shed += 1
+            raise SchedulerRejected("shed")
+
+        self._queued[key] = entry
+        heapq.heappush(self._heap, entry)
+        self._pump()
+
+        try:
+            await entry.future
+        except asyncio.CancelledError:
+            if entry.future.done() and not entry.future.cancelled() and entry.future.exception() is None:
+                # Slot was granted just as we were cancelled
+                self._release()
+            elif not entry.dead:
+                self._drop(entry, "cancelled")
+            raise
+
+        try:
+            return await factory()
+        finally:
+            self.completed += 1
+            self._release()
+
+    def _release(self):
+        self._inflight -= 1
+        self._pump()
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "queue_depth": self.queue_depth,
+            "inflight": self._inflight,
+            "max_inflight": self.max_inflight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "merged": self.merged,
+            "shed": self.shed,
+            "stale": self.stale,
+            "wait_p50_ms": waits[len(waits) // 2] * 1000 if waits else 0.0,
+            "wait_p95_ms": waits[int(len(waits) * 0.95)] * 1000 if waits else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+        }
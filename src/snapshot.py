@@ -0,0 +1,248 @@
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger("Snapshot")
+
+SNAPSHOT_PATH = Path("data") / "snapshot.bin"
+MAGIC = b"BOBSNAP1"
+_HEADER = struct.Struct(">I")  # Length of the compressed index that follows the magic
+
+class SnapshotAuthor:
+    """The parts of a discord.User the reply path reads, restored from a snapshot."""
+
+    __slots__ = ("id", "name", "display_name", "bot")
+
+    def __init__(self, id, name, display_name, bot):
+        self.id = id
+        self.name = name
+        self.display_name = display_name
+        self.bot = bot
+
+    def __str__(self):
+        return self.name
+
+class SnapshotMessage:
+    """A cached message restored from a snapshot; same surface as discord.Message for history and prompts."""
+
+    __slots__ = ("id", "channel", "guild", "author", "content", "created_at", "mentions", "reference")
+
+    def __init__(self, channel, id, author, content, created_at):
+        self.id = id
+        self.channel = channel
+        self.guild = getattr(channel, "guild", None)
+        self.author = author
+        self.content = content
+        self.created_at = created_at
+        self.mentions = []
+        self.reference = None
+
+def _pack_message(message) -> list:
+    author = message.author
+    return [message.id, author.id, str(author), author.display_name, bool(author.bot),
+            message.content, message.created_at.timestamp()]
+
+class SnapshotStore:
+    """
+    Warm-restart state in one local file: the recent per-channel context
+    (message buffers and rolling summaries), channels with a burst or reply
+    still pending, and the respect-tier cache.
+
+    Each channel is its own zlib-compressed JSON blob, located through a
+    small compressed index at the head of the file. On startup only the
+    index is read; the file is memory-mapped and a channel's blob is
+    decompressed the first time that channel needs its history. Saving
+    copies plain fields on the event loop (yielding between chunks) and
+    compresses and writes on a worker thread, replacing the file atomically.
+    Snapshots older than `max_age` seconds restore tiers only; their
+    context and bursts are too stale to trust, as is any channel that saw
+    messages during the restart (see discard_stale).
+    """
+
+    def __init__(self, path=None, max_age: float = 600.0, chunk: int = 50):
+        self.path = Path(path or os.getenv("BOB_SNAPSHOT_PATH", SNAPSHOT_PATH))
+        self.max_age = max_age
+        self.chunk = chunk  # Channels copied per event-loop slice while saving
+
+        self._write_lock = threading.Lock()  # A cancelled save's thread may still be writing when close() saves
+        self._file = None
+        self._map = None
+        self._base = 0  # Offset of the first blob
+        self._channels = {}  # channel_id -> (offset, length, newest message id), unrestored channels only
+        self._bursts = []
+        self._tiers = []
+        self.age = None
+
+        self.restored_channels = 0
+        self.discarded_channels = 0
+        self.restored_messages = 0
+        self.restore_seconds = 0.0
+        self.saves = 0
+        self.last_save_bytes = 0
+        self.last_save_ms = 0.0
+
+    # --- Restore ---
+
+    def load(self) -> bool:
+        """Maps the snapshot and reads its index. False if there is no usable snapshot."""
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError("not a Bob snapshot")
+            start = len(MAGIC) + _HEADER.size
+            (index_len,) = _HEADER.unpack_from(self._map, len(MAGIC))
+            index = json.loads(zlib.decompress(self._map[start:start + index_len]))
+        except Exception as e:
+            logger.error(f"Ignoring unreadable snapshot {self.path}: {e}")
+            self.close()
+            return False
+
+        self._base = start + index_len
+        self.age = max(0.0, time.time() - index["saved_at"])
+        self._tiers = [(key, tier, ttl - self.age) for key, tier, ttl in index["tiers"] if ttl > self.age]
+        if self.age <= self.max_age:
+            self._channels = {int(cid): tuple(loc) for cid, loc in index["channels"].items()}
+            self._bursts = index["bursts"]
+        logger.info(f"Snapshot from {self.age:.0f}s ago: {len(self._channels)} channels, "
+                    f"{len(self._bursts)} pending bursts, {len(self._tiers)} tiers")
+        if not self._channels:
+            self.close()
+        return True
+
+    def discard_stale(self, get_channel) -> int:
+        """
+        Drops saved channels that got messages while Bob was down (their
+        last_message_id from the gateway is past the snapshot); those would
+        restore with a hole in them and are fetched normally instead.
+        """
+        stale = []
+        for channel_id, (_, _, newest) in self._channels.items():
+            channel = get_channel(channel_id)
+            last = getattr(channel, "last_message_id", None)
+            if last is not None and last > newest:
+                stale.append(channel_id)
+        for channel_id in stale:
+            del self._channels[channel_id]
+        self.discarded_channels += len(stale)
+        if stale:
+            logger.info(f"Snapshot: {len(stale)} channels changed during the restart, fetching them instead")
+        if not self._channels:
+            self.close()
+        return len(stale)
+
+    def take_tiers(self) -> list:
+        """(user_id, tier, seconds left) entries for the tier cache, once."""
+        tiers, self._tiers = self._tiers, []
+        return tiers
+
+    def take_bursts(self) -> list:
+        """Channel ids that had a reply pending at shutdown, once."""
+        bursts, self._bursts = self._bursts, []
+        return bursts
+
+    def restore_channel(self, channel):
+        """
+        (messages, summary) saved for `channel`, decompressed on first request,
+        or None if the snapshot doesn't have it. summary is (lines, last_id) or None.
+        """
+        location = self._channels.pop(channel.id, None)
+        if location is None:
+            return None
+        started = time.perf_counter()
+        offset, length, _ = location
+        data = json.loads(zlib.decompress(self._map[self._base + offset:self._base + offset + length]))
+        authors = {}
+        messages = []
+        for message_id, author_id, name, display_name, bot, content, created in data["m"]:
+            author = authors.get(author_id)
+            if author is None:
+                author = authors[author_id] = SnapshotAuthor(author_id, name, display_name, bot)
+            messages.append(SnapshotMessage(
+                channel, message_id, author, content, datetime.fromtimestamp(created, timezone.utc),
+            ))
+        self.restored_channels += 1
+        self.restored_messages += len(messages)
+        self.restore_seconds += time.perf_counter() - started
+        if not self._channels:
+            self.close()  # Everything is back in memory; release the mapping
+        return messages, data["s"]
+
+    def close(self):
+        self._channels = {}
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- Save ---
+
+    async def save(self, message_cache, context_window, tier_cache, burst_channels):
+        """Snapshots the hot state. Reads on the event loop in slices, writes on a worker thread."""
+        started = time.perf_counter()
+        channels = []
+        warm = message_cache.warm_channels()
+        for i in range(0, len(warm), self.chunk):
+            for channel_id, messages in warm[i:i + self.chunk]:
+                channels.append((channel_id, [_pack_message(m) for m in messages], context_window.export(channel_id)))
+            await asyncio.sleep(0)  # Let gateway events through between slices
+        index = {
+            "saved_at": time.time(),
+            "bursts": sorted(set(burst_channels)),
+            "tiers": [[key, tier, ttl] for key, tier, ttl in tier_cache.items()],
+        }
+        self.last_save_bytes = await asyncio.to_thread(self._write, channels, index)
+        self.saves += 1
+        self.last_save_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Saved snapshot: {len(channels)} channels, {len(index['bursts'])} pending bursts, "
+                    f"{self.last_save_bytes / 1024:.0f} KiB in {self.last_save_ms:.0f} ms")
+
+    def _write(self, channels: list, index: dict) -> int:
+        blobs = []
+        locations = {}
+        offset = 0
+        for channel_id, messages, summary in channels:
+            blob = zlib.compress(json.dumps({"m": messages, "s": summary}, separators=(",", ":")).encode())
+            locations[str(channel_id)] = [offset, len(blob), messages[-1][0] if messages else 0]
+            blobs.append(blob)
+            offset += len(blob)
+        index["channels"] = locations
+        packed_index = zlib.compress(json.dumps(index, separators=(",", ":")).encode())
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with self._write_lock:
+            with open(tmp, "wb") as f:
+                f.write(MAGIC)
+                f.write(_HEADER.pack(len(packed_index)))
+                f.write(packed_index)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(tmp, self.path)  # A mapping of the previous file stays valid
+        return len(MAGIC) + _HEADER.size + len(packed_index) + offset
+
+    def stats(self) -> dict:
+        return {
+            "age_s": self.age,
+            "unrestored_channels": len(self._channels),
+            "restored_channels": self.restored_channels,
+            "discarded_channels": self.discarded_channels,
+            "restored_messages": self.restored_messages,
+            "restore_ms": self.restore_seconds * 1000,
+            "saves": self.saves,
+            "last_save_bytes": self.last_save_bytes,
+            "last_save_ms": self.last_save_ms,
+        }
@@ -0,0 +1,116 @@
+import logging
+import re
+import time
+
+from src.outbound import split_message
+
+logger = logging.getLogger("Streaming")
+
+SILENCE_TOKEN = "[SILENCE]"
+TOOL_OPEN = "[[TX:"
+DISCORD_LIMIT = 2000
+
+_TOOL_BLOCK = re.compile(r'\[\[TX:.*?\]\]', flags=re.DOTALL)
+_PREFIX = re.compile(r'^(Bob|Response):\s*', flags=re.IGNORECASE)
+_PREFIX_WORDS = ("bob:", "response:")
+
+def finalize_text(raw: str) -> str:
+    """Same post-processing the non-streaming clients apply to a full completion."""
+    if not raw or SILENCE_TOKEN in raw:
+        return ""
+    return _PREFIX.sub('', raw).strip()
+
+def visible_text(raw: str) -> str:
+    """
+    The part of a partial completion that is safe to show.
+    Holds back anything that could still turn into [SILENCE], a `Bob:` prefix
+    or a [[TX: ...]] tool call, so none of them ever flash up in the channel.
+    """
+    if SILENCE_TOKEN in raw:
+        return ""
+
+    text = raw.lstrip()
+    lowered = text.lower()
+    if any(word.startswith(lowered) for word in _PREFIX_WORDS):
+        return ""
+    text = _PREFIX.sub('', text)
+
+    # Complete tool calls are removed; an unclosed one hides everything after it
+    text = _TOOL_BLOCK.sub('', text)
+    open_at = text.find("[[")
+    if open_at != -1:
+        text = text[:open_at]
+
+    # A trailing "[" or "[SILEN" may be the start of a control token
+    bracket = text.rfind("[")
+    if bracket != -1:
+        tail = text[bracket:]
+        if SILENCE_TOKEN.startswith(tail) or TOOL_OPEN.startswith(tail):
+            text = text[:bracket]
+
+    return text.strip()
+
+class StreamingReply:
+    """
+    Shows a streamed completion in a channel: one message posted as soon as
+    there is something worth showing, then edited in batches no more often
+    than `edit_interval` (Discord allows ~5 edits per 5s per channel).
+    New messages go out through `send(text)` (default: channel.send).
+    """
+
+    def __init__(self, channel, min_first_chars: int = 12, edit_interval: float = 1.2, send=None):
+        self.channel = channel
+        self._send = send or channel.send
+        self.min_first_chars = min_first_chars
+        self.edit_interval = edit_interval
+
+        self.message = None
+        self.raw = ""
+        self.first_visible_at = None  # perf_counter timestamp of the first post
+        self._shown = ""
+        self._last_edit = 0.0
+
+    async def _show(self, text: str):
+        text = text[:DISCORD_LIMIT]
+        if text == self._shown or not text:
+            return  # Discord rejects empty messages; a preview that went blank stays until finish()
+        if self.message is None:
+            self.message = await self._send(text)
+            self.first_visible_at = time.perf_counter()
+        else:
+            await self.message.edit(content=text)
+        self._shown = text
+        self._last_edit = time.monotonic()
+
+    async def consume(self, chunks) -> str:
+        """Reads the whole token stream, updating the message along the way. Returns the raw text."""
+        async for chunk in chunks:
+            self.raw += chunk
+            visible = visible_text(self.raw)
+            if self.message is None:
+                if len(visible) >= self.min_first_chars:
+                    await self._show(visible)
+            elif time.monotonic() - self._last_edit >= self.edit_interval:
+                await self._show(visible)
+        return self.raw
+
+    async def finish(self, final_text: str):
+        """
+        Replaces the streamed preview with the final text.
+        An empty final text (silence, or a tool call that replaced the reply) removes the preview.
+        Also the cleanup for a run that failed or was cancelled before committing its reply.
+        """
+        if not final_text:
+            if self.message is not None:
+                try:
+                    await self.message.delete()
+                except Exception as e:
+                    logger.error(f"Failed to remove streamed preview: {e}")
+                self.message = None
+            return
+
+        chunks = split_message(final_text, DISCORD_LIMIT)
+        await self._show(chunks[0])
+        # Anything past Discord's limit goes out as follow-up messages
+        for chunk in chunks[1:]:
+            await self._send(chunk)
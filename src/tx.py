@@ -0,0 +1,269 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+from src.outbound import LANE_REPLY
+
+logger = logging.getLogger("TX")
+
+GROUPS_PATH = Path("data") / "tx_groups.json"
+
+TX_BLOCK = re.compile(r'\[\[TX:\s*(.*?)\s*\|\s*(.*?)\s*\|\s*(.*?)\]\]', flags=re.DOTALL)
+CURRENT_SERVER = ("this server", "current server", "here")
+
+class Target:
+    """One requested destination: a channel id, a server/channel name pair, or a named group."""
+
+    __slots__ = ("channel_id", "server", "channel", "group")
+
+    def __init__(self, channel_id: int = None, server: str = None, channel: str = None, group: str = None):
+        self.channel_id = channel_id
+        self.server = server
+        self.channel = channel
+        self.group = group
+
+    def __repr__(self):
+        if self.group is not None:
+            return f"@{self.group}"
+        if self.channel_id is not None:
+            return str(self.channel_id)
+        return f"{self.server}/{self.channel}"
+
+class TxResult:
+    __slots__ = ("target", "channel", "ok", "note")
+
+    def __init__(self, target: Target, channel=None, ok: bool = False, note: str = ""):
+        self.target = target
+        self.channel = channel
+        self.ok = ok
+        self.note = note
+
+    @property
+    def label(self) -> str:
+        if self.channel is None:
+            return repr(self.target)
+        guild = getattr(self.channel, "guild", None)
+        return f"{guild.name}/#{self.channel.name}" if guild else f"#{getattr(self.channel, 'name', self.channel.id)}"
+
+def _split(field: str) -> list:
+    return [part.strip() for part in field.split(",") if part.strip()]
+
+def parse_tool_calls(text: str):
+    """
+    Every [[TX: servers | channels | message]] block in a completion, as
+    (targets, message) pairs, plus the text with the blocks removed.
+    Servers and channels may be comma-separated (every server x every
+    channel); a server written as @name is a target group and needs no channel.
+    """
+    calls = []
+    for match in TX_BLOCK.finditer(text):
+        servers, channels, content = match.groups()
+        targets = []
+        for server in _split(servers):
+            if server.startswith("@"):
+                targets.append(Target(group=server[1:]))
+            else:
+                # A server without channels still becomes a target, so the summary can say what's missing
+                targets.extend(Target(server=server, channel=channel) for channel in _split(channels) or [""])
+        calls.append((targets, content.strip()))
+    return calls, TX_BLOCK.sub("", text).strip()
+
+def parse_command_targets(field: str) -> list:
+    """`!tx` targets: comma-separated channel ids and @groups. Raises ValueError on anything else."""
+    targets = []
+    for part in _split(field):
+        if part.startswith("@"):
+            targets.append(Target(group=part[1:]))
+        else:
+            targets.append(Target(channel_id=int(part.strip("<#>"))))
+    if not targets:
+        raise ValueError("no targets")
+    return targets
+
+class TxGroups:
+    """
+    Named broadcast lists from data/tx_groups.json (BOB_TX_GROUPS), re-read when its mtime changes:
+
+        {"announcements": [123456789012345678, {"server": "My Server", "channel": "general"}]}
+    """
+
+    def __init__(self, path=None, reload_interval: float = 2.0):
+        self.path = Path(path or os.getenv("BOB_TX_GROUPS", GROUPS_PATH))
+        self.reload_interval = reload_interval
+        self._groups = {}
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        if mtime is None:
+            self._groups = {}
+            return
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            self._groups = {
+                name.casefold(): [
+                    Target(channel_id=int(entry)) if not isinstance(entry, dict)
+                    else Target(server=entry["server"], channel=entry["channel"])
+                    for entry in entries
+                ]
+                for name, entries in raw.items()
+            }
+        except Exception as e:
+            logger.error(f"Invalid TX groups file {self.path}, keeping the previous groups: {e}")
+            return
+        logger.info(f"Loaded {len(self._groups)} TX groups")
+
+    def get(self, name: str):
+        self._maybe_reload()
+        return self._groups.get(name.casefold())
+
+    def __len__(self):
+        self._maybe_reload()
+        return len(self._groups)
+
+class TxFanout:
+    """
+    Delivers every (targets, message) pair of one completion or command as a
+    single batch. Each target is resolved and sent in its own task, at most
+    `concurrency` at a time across the whole batch, and the batch holds at
+    most `max_targets` targets; the sends themselves go through the outbound
+    dispatcher, so per-channel and global rate limits still hold. The same
+    message to the same channel is sent once, whichever block asked for it.
+    """
+
+    def __init__(self, client, names, outbound, groups: TxGroups = None, concurrency: int = 8, max_targets: int = 25):
+        self.client = client
+        self.names = names
+        self.outbound = outbound
+        self.groups = groups or TxGroups()
+        self.concurrency = concurrency
+        self.max_targets = max_targets
+
+        self.batches = 0
+        self.targets = 0
+        self.delivered = 0
+        self.failed = 0
+        self.largest_batch = 0
+
+    def expand(self, calls: list) -> tuple:
+        """
+        Flattens (targets, content) pairs into unique (target, content) items,
+        replacing groups with their members. Returns (items, results for unknown groups).
+        """
+        expanded, failures = [], []
+        seen = set()  # Spelled-identical repeats don't count toward the target limit
+        for targets, content in calls:
+            for target in targets:
+                members = [target] if target.group is None else self.groups.get(target.group)
+                if members is None:
+                    failures.append(TxResult(target, note="no such group"))
+                    continue
+                for member in members:
+                    key = (repr(member).casefold(), content)
+                    if key not in seen:
+                        seen.add(key)
+                        expanded.append((member, content))
+        return expanded, failures
+
+    async def _resolve(self, target: Target, origin_guild):
+        """Returns (channel, note); channel is None if it can't be found."""
+        if target.channel_id is not None:
+            channel = self.client.get_channel(target.channel_id)
+            if channel is None:
+                try:
+                    channel = await self.client.fetch_channel(target.channel_id)
+                except Exception as e:
+                    return None, f"not found ({e.__class__.__name__})"
+            return channel, ""
+
+        notes = []
+        if origin_guild is not None and target.server.lower() in (*CURRENT_SERVER, origin_guild.name.lower()):
+            guild = origin_guild
+        else:
+            # Exact, then case-insensitive, then fuzzy via the name index
+            guild, fuzzy = self.names.resolve_guild(target.server)
+            if guild is None:
+                return None, f"no server looking like '{target.server}'"
+            if fuzzy:
+                notes.append(f"server '{target.server}' -> '{guild.name}'")
+
+        channel, fuzzy = self.names.resolve_channel(guild, target.channel)
+        if channel is None:
+            return None, f"'{guild.name}' has no channel looking like '{target.channel}'"
+        if fuzzy:
+            notes.append(f"channel '{target.channel}' -> '{channel.name}'")
+        return channel, "assumed " + ", ".join(notes) if notes else ""
+
+    async def send(self, calls: list, origin_guild=None, lane: int = LANE_REPLY) -> list:
+        """
+        Resolves and sends every (targets, content) pair concurrently, as one
+        batch under one limit. Returns one TxResult per target.
+        """
+        items, results = self.expand(calls)
+        if len(items) > self.max_targets:
+            results.extend(TxResult(t, note=f"over the {self.max_targets}-target limit") for t, _ in items[self.max_targets:])
+            items = items[:self.max_targets]
+
+        self.batches += 1
+        self.targets += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+        slots = asyncio.Semaphore(self.concurrency)
+        claimed = set()  # (channel id, content) pairs already being sent in this batch
+
+        async def deliver(target: Target, content: str) -> TxResult:
+            async with slots:
+                channel, note = await self._resolve(target, origin_guild)
+                if channel is None:
+                    return TxResult(target, note=note)
+                if (channel.id, content) in claimed:
+                    return TxResult(target, channel, ok=True, note="duplicate, sent once")
+                claimed.add((channel.id, content))
+                try:
+                    await self.outbound.send(channel, content, lane)
+                except Exception as e:
+                    logger.error(f"TX to {channel.id} failed: {e}")
+                    return TxResult(target, channel, note=f"send failed: {e}")
+                return TxResult(target, channel, ok=True, note=note)
+
+        results = list(await asyncio.gather(*(deliver(t, c) for t, c in items))) + results
+        for result in results:
+            if result.ok:
+                self.delivered += 1
+            else:
+                self.failed += 1
+        logger.info(f"TX batch: {sum(r.ok for r in results)}/{len(results)} targets delivered")
+        return results
+
+    @staticmethod
+    def summary(results: list) -> str:
+        """One line per target: ✅/❌, where it went, and any fuzzy assumption or error."""
+        delivered = sum(r.ok for r in results)
+        lines = [f"📡 Delivered to {delivered}/{len(results)}:"]
+        for r in results:
+            lines.append(f"{'✅' if r.ok else '❌'} {r.label}" + (f" ({r.note})" if r.note else ""))
+        return "\n".join(lines)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "targets": self.targets,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "largest_batch": self.largest_batch,
+            "groups": len(self.groups),
+        }
@@ -1,23 +1,242 @@
 import discord
 import edge_tts
 import asyncio
-import os
+import io
 import logging
-import tempfile
+import os
+import queue
+import re
+from collections import deque
+
+from src.audio_cache import AudioCache, OpusClip, clip_key
 
 logger = logging.getLogger("VoiceClient")
+_background = set()  # Strong refs to fire-and-forget cache writes
+
+class AudioPipe(io.RawIOBase):
+    """
+    In-memory pipe between edge-tts (event loop side) and FFmpeg's stdin.
+    discord.py's FFmpeg pipe-writer thread calls read(), which blocks until
+    the next chunk arrives, so playback starts on the first chunk and no
+    temp file is shared between utterances.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = queue.SimpleQueue()
+        self._pending = b""
+        self._eof = False
+        self.bytes_fed = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def feed(self, data: bytes):
+        if data:
+            self.bytes_fed += len(data)
+            self._chunks.put(data)
+
+    def close_writer(self):
+        """Signals end of audio; the reader sees EOF once buffered chunks are drained."""
+        self._chunks.put(None)
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._pending and not self._eof:
+            chunk = self._chunks.get()  # Blocks the FFmpeg writer thread, never the event loop
+            if chunk is None:
+                self._eof = True
+            else:
+                self._pending = chunk
+        if size is None or size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+|\n+')
+
+def split_sentences(text: str, min_chars: int = 24, max_chars: int = 280) -> list:
+    """
+    Splits a reply into sentence-sized pieces for chunked synthesis.
+    Fragments shorter than min_chars are merged into their neighbour (tiny
+    clips sound choppy), and run-on sentences are cut at a comma or space.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(", ", 0, max_chars), sentence.rfind(" ", 0, max_chars))
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if not sentence:
+            continue
+        if pieces and (len(pieces[-1]) < min_chars or len(sentence) < min_chars) and len(pieces[-1]) + len(sentence) < max_chars:
+            pieces[-1] = f"{pieces[-1]} {sentence}"
+        else:
+            pieces.append(sentence)
+    return pieces
+
+class _Synthesis:
+    """
+    One sentence synthesized into memory in the background; playback may start before it finishes.
+    A cached clip short-circuits synthesis and is exposed as `opus`.
+    """
+
+    def __init__(self, text: str, voice_name: str, slots: asyncio.Semaphore, cache: AudioCache = None):
+        self.text = text
+        self.chunks = []
+        self.opus = None
+        self.done = False
+        self.checked = asyncio.Event()  # Set once we know whether the clip was cached
+        self._more = asyncio.Event()
+        self._task = asyncio.create_task(self._run(voice_name, slots, cache))
+
+    async def _run(self, voice_name, slots, cache):
+        key = clip_key(self.text, voice_name) if cache else None
+        try:
+            if cache:
+                self.opus = await cache.get(key)
+            self.checked.set()
+            if self.opus is not None:
+                return
+            async with slots:  # Global cap on concurrent syntheses across all guilds
+                communicate = edge_tts.Communicate(self.text, voice_name)
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        self.chunks.append(chunk["data"])
+                        self._more.set()
+            if cache:
+                # Transcoding runs off the playback path; the clip is served from cache next time
+                task = asyncio.create_task(cache.put(key, b"".join(self.chunks)))
+                _background.add(task)
+                task.add_done_callback(_background.discard)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"TTS Error: {e}")
+        finally:
+            self.done = True
+            self.checked.set()
+            self._more.set()
+
+    async def pipe_into(self, pipe: AudioPipe):
+        """Feeds audio into the pipe as it is produced, then closes it."""
+        sent = 0
+        try:
+            while True:
+                while sent < len(self.chunks):
+                    pipe.feed(self.chunks[sent])
+                    sent += 1
+                if self.done:
+                    return
+                self._more.clear()
+                await self._more.wait()
+        finally:
+            pipe.close_writer()
+
+    def cancel(self):
+        self._task.cancel()
+
+class GuildPlayer:
+    """
+    Per-guild playback queue. Sentences play back to back; the next
+    `lookahead` sentences are synthesized while the current one plays.
+    """
+
+    def __init__(self, voice, guild):
+        self.voice = voice
+        self.guild = guild
+        self._sentences = deque()  # Not yet being synthesized
+        self._ahead = deque()  # _Synthesis objects, next to play first
+        self._task = None
+
+    @property
+    def busy(self) -> bool:
+        return self._task is not None
+
+    def enqueue(self, sentences: list):
+        room = self.voice.max_queued - len(self._sentences) - len(self._ahead)
+        if room < len(sentences):
+            logger.warning(f"Voice queue full in guild {self.guild.id}, dropping {len(sentences) - max(room, 0)} sentences.")
+        self._sentences.extend(sentences[:max(room, 0)])
+        if self._task is None and (self._sentences or self._ahead):
+            self._task = asyncio.create_task(self._run())
+
+    def clear(self):
+        """Drops everything queued and stops the current clip."""
+        self._sentences.clear()
+        while self._ahead:
+            self._ahead.popleft().cancel()
+        voice_client = self.guild.voice_client
+        if voice_client and voice_client.is_playing():
+            voice_client.stop()
+
+    async def _run(self):
+        try:
+            while self._sentences or self._ahead:
+                while self._sentences and len(self._ahead) <= self.voice.lookahead:
+                    self._ahead.append(_Synthesis(
+                        self._sentences.popleft(), self.voice.voice_name, self.voice.synthesis_slots, self.voice.cache,
+                    ))
+                current = self._ahead.popleft()
+                if not await self._play(current):
+                    self.clear()
+        except Exception as e:
+            logger.error(f"Voice playback error in guild {self.guild.id}: {e}")
+            self.clear()
+        finally:
+            self._task = None
+
+    async def _play(self, synthesis: _Synthesis) -> bool:
+        """Plays one sentence to the end. False if the bot is no longer connected."""
+        voice_client = self.guild.voice_client
+        if not voice_client or not voice_client.is_connected():
+            synthesis.cancel()
+            return False
+
+        loop = asyncio.get_running_loop()
+        finished = asyncio.Event()
+
+        def after(error):
+            if error:
+                logger.error(f"Player error: {error}")
+            loop.call_soon_threadsafe(finished.set)
+
+        await synthesis.checked.wait()
+        if synthesis.opus is not None:
+            voice_client.play(OpusClip(synthesis.opus), after=after)
+        else:
+            pipe = AudioPipe()
+            # FFmpeg reads MP3 from stdin; each sentence gets its own pipe and process
+            source = discord.FFmpegPCMAudio(pipe, pipe=True, before_options="-f mp3")
+            voice_client.play(source, after=after)
+            await synthesis.pipe_into(pipe)
+        await finished.wait()
+        return True
 
 class BobVoice:
     def __init__(self, bot):
         self.bot = bot
         # Voices: en-US-ChristopherNeural (Male, deep), en-US-GuyNeural (Male, clear)
-        self.voice_name = "en-US-ChristopherNeural" 
-        self.temp_dir = tempfile.gettempdir()
+        self.voice_name = "en-US-ChristopherNeural"
+        # What a new reply does while Bob is still talking: queue, drop or interrupt
+        self.policy = os.getenv("BOB_VOICE_POLICY", "queue")
+        self.lookahead = 2  # Sentences synthesized ahead of the one playing
+        self.max_queued = 40
+        self.synthesis_slots = asyncio.Semaphore(int(os.getenv("BOB_TTS_WORKERS", "4")))
+        self._players = {}  # guild_id -> GuildPlayer
+        self.cache = AudioCache(
+            memory_bytes=int(os.getenv("BOB_TTS_CACHE_MEMORY_MB", "8")) << 20,
+            disk_bytes=int(os.getenv("BOB_TTS_CACHE_DISK_MB", "256")) << 20,
+        ) if os.getenv("BOB_TTS_CACHE", "1") == "1" else None
+        self.dropped = 0
+        self.interrupted = 0
+        self.sentences = 0
 
     async def speak(self, ctx_or_channel, text: str):
         """
-        Generates TTS and plays it in the connected voice channel.
-        Finds the voice client for the specific guild.
+        Queues TTS for the connected voice channel, split at sentence boundaries.
+        Finds the voice client for the specific guild. Returns once queued.
         """
         if not text:
             return
@@ -34,22 +253,22 @@ class BobVoice:
             else:
                 return # Cannot speak if not connected
 
-        if voice_client.is_playing():
-             voice_client.stop()
+        player = self._players.get(guild.id)
+        if player is None:
+            player = self._players[guild.id] = GuildPlayer(self, guild)
 
-        try:
-            # Generate Audio File
-            communicate = edge_tts.Communicate(text, self.voice_name)
-            output_file = os.path.join(self.temp_dir, f"bob_voice_{guild.id}.mp3")
-            await communicate.save(output_file)
-
-            # Play Audio using FFmpeg
-            # Ensure ffmpeg is installed/monitor usage
-            source = discord.FFmpegPCMAudio(output_file)
-            voice_client.play(source, after=lambda e: logger.error(f"Player error: {e}") if e else None)
-            
-        except Exception as e:
-            logger.error(f"TTS Error: {e}")
+        if player.busy:
+            if self.policy == "drop":
+                logger.info(f"Already speaking in guild {guild.id}, dropping reply.")
+                self.dropped += 1
+                return
+            if self.policy == "interrupt":
+                player.clear()
+                self.interrupted += 1
+
+        sentences = split_sentences(text)
+        self.sentences += len(sentences)
+        player.enqueue(sentences)
 
     async def join_channel(self, channel):
         if channel.guild.voice_client:
@@ -58,5 +277,19 @@ class BobVoice:
             await channel.connect()
 
     async def leave(self, guild):
+        player = self._players.pop(guild.id, None)
+        if player:
+            player.clear()
         if guild.voice_client:
             await guild.voice_client.disconnect()
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "players": len(self._players),
+            "speaking": sum(p.busy for p in self._players.values()),
+            "sentences": self.sentences,
+            "dropped": self.dropped,
+            "interrupted": self.interrupted,
+            "cache": self.cache.stats() if self.cache else None,
+        }
@@ -0,0 +1,116 @@
+"""
+Regression checks for the per-channel single-flight reply logic: bursts that
+wait behind a running reply must still be answered, and a reply that is
+already being delivered is never cancelled by a newer burst.
+
+Offline (bench_load fakes, scripted provider). Run with pytest or directly:
+python test_single_flight.py
+"""
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+
+from benchmarks.bench_load import FakeChannel, FakeGuild, FakeUser
+from src.bot import BobBot
+from src.database import RespectRepository
+from src.providers import LLMClient, ProviderRouter
+
+class EchoProvider(LLMClient):
+    """Answers the newest user turn after `latency` seconds, so replies say what they answered."""
+
+    name = "echo"
+
+    def __init__(self, latency: float, prompts=None):
+        super().__init__(prompts=prompts)
+        self.latency = latency
+        self.calls = 0
+
+    async def _complete(self, messages: list) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        question = next(m["content"] for m in reversed(messages) if m["role"] == "user")
+        return f"re {question.split(': ', 1)[1]}"
+
+class SlowSendChannel(FakeChannel):
+    send_delay = 0.0
+
+    async def send(self, content):
+        await asyncio.sleep(self.send_delay)
+        return await super().send(content)
+
+async def make_bot(tmp: str, policy: str, latency: float, max_supersede: int = 3):
+    bot = BobBot()
+    bot._connection.user = FakeUser(1, "Bob", bot=True)
+    bot.tiers = RespectRepository(db_path=Path(tmp) / "respect.db")
+    await bot.tiers.open()
+    bot.behavior = None
+    bot.supersede_policy = policy
+    bot.max_supersede = max_supersede
+    bot.debouncer.min_window = bot.debouncer.max_window = 0.2
+    provider = EchoProvider(latency, prompts=bot.prompts)
+    bot.llm = ProviderRouter([provider], hedge_after=60, prompts=bot.prompts)
+    guild = FakeGuild(10, "Guild")
+    channel = SlowSendChannel(bot, 10_000, "general", guild, 0)
+    guild.text_channels.append(channel)
+    return bot, provider, channel
+
+async def drain(bot, timeout: float = 15.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if not bot.reply_tasks and not bot.debouncer.stats()["pending"]:
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("replies did not finish")
+
+def bob_replies(channel) -> list:
+    return [m.content for m in channel.messages if m.author.bot]
+
+async def _run(scenario):
+    with tempfile.TemporaryDirectory() as tmp:
+        bot, provider, channel = await make_bot(tmp, **scenario["bot"])
+        user = FakeUser(2, "alice")
+        for delay, text in scenario["messages"]:
+            await asyncio.sleep(delay)
+            await channel.post(user, text)
+        await drain(bot)
+        await bot.outbound.close()
+        await bot.tiers.close()
+        return bot, provider, channel
+
+def test_follow_up_after_late_reply_is_answered():
+    # "and of germany" arrives while France is being answered; the France reply then lands after it
+    bot, provider, channel = asyncio.run(_run({
+        "bot": {"policy": "follow_up", "latency": 1.0},
+        "messages": [(0, "capital of france"), (0.5, "and of germany")],
+    }))
+    assert bob_replies(channel) == ["re capital of france", "re and of germany"]
+    assert provider.calls == 2
+
+def test_burst_after_supersede_cap_is_answered():
+    # Question 2 cancels question 1; question 3 hits the cap, so 2 runs to completion and 3 must follow it
+    bot, provider, channel = asyncio.run(_run({
+        "bot": {"policy": "cancel", "latency": 1.0, "max_supersede": 1},
+        "messages": [(0, "question 1"), (0.5, "question 2"), (0.6, "question 3")],
+    }))
+    assert bob_replies(channel) == ["re question 2", "re question 3"]
+
+def test_reply_being_sent_is_not_cancelled():
+    SlowSendChannel.send_delay = 1.0
+    try:
+        bot, provider, channel = asyncio.run(_run({
+            "bot": {"policy": "cancel", "latency": 0.3},
+            "messages": [(0, "first"), (0.8, "second")],  # Lands while "re first" is being sent
+        }))
+    finally:
+        SlowSendChannel.send_delay = 0.0
+    assert bob_replies(channel) == ["re first", "re second"]
+    assert bot.metrics.counter("generations_superseded") == 0
+    assert bot.metrics.counter("follow_ups") == 1
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"ok  {name}")